@@ -5,15 +5,14 @@ This example shows how to simulate / live trade with timeframes on daily level a
 
 Change main() at the bottom of the file whether you would like to run simulation or live trading example.
 
-
-TODO
-Test update functionality of 1d with both 1d and 1m inputs
+The live example updates the daily candle from a stream of 1m candles, which in turn updates weekly and monthly candles.
 
 """
 
 
 import _setpath
 
+import numpy as np
 import pandas as pd
 from vbt_sim_live import GenericData, SimData, LiveData, TFs
 
@@ -112,10 +111,27 @@ class TesterLive:
 		live_data['M1'].set_indicators(indicator_info)		
 		live_data['M1'].prepare_indicators()
 		
-		# updating of data not yet included
-		# needs to be defined what possible input is to update daily candles
-		# would this be minute updates or daily updates?
+		# daily candles are updated from 1m candles of the regular session (see TradingCalendar),
+		# here we use 1m data of the first day that is not part of the daily data
+		df_m1 = GenericData.df_ensure_format(pd.read_csv("OHLC_Test_Minute_Data.csv"))
+		split = np.searchsorted(df_m1.index.values, df.index.values[-1] + np.timedelta64(1, 'D'))
+		df_pre = df_m1[:split]
+		df_update = df_m1[split:]
+		
+		live_data['m1'] = LiveData.from_df(df_pre, symbol, TFs['m1'])
+		
+		# m1 updates d1, d1 updates w1 and M1. Indicators of a higher timeframe are only updated when its candle has changed,
+		# and not at all for 1m candles outside of the session
+		live_data['m1'].add_dependent(live_data['d1'])
+		live_data['d1'].add_dependent(live_data['w1'])
+		live_data['d1'].add_dependent(live_data['M1'])
+		
+		for date, update_m1 in df_update.iterrows():
+			live_data['m1'].update(update_m1)
+			live_data['m1'].cascade()
 
+		print(live_data['d1'].to_df(tz_convert=False).tail())
+		
 		# convert monthly data to DataFrame and display the results
 		df = live_data['M1'].to_df(tz_convert=False)
 		print(df)
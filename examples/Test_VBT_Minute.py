@@ -19,8 +19,9 @@ Change main() at the bottom of the file whether you would like to run simulation
 import _setpath
 
 from datetime import datetime
-from vbt_sim_live import GenericData, SimData, LiveData, TFs
+from vbt_sim_live import GenericData, SimData, LiveData, TFs, ohlc_record_dtype
 
+import numpy as np
 import pandas as pd
 import pytz
 import time
@@ -161,9 +162,9 @@ class TesterLive:
 
 		# create ohlc data for timeframes of interest
 		# m1 data is coming from the source, other timeframes are resampled from m1
+		# all higher timeframes are resampled in one go, m30 is built from the m5 candles
 		live_data['m1'] = LiveData.from_df(df_pre, symbol, TFs['m1'], log_handler=print)
-		live_data['m5'] = live_data['m1'].resample(TFs['m5'])
-		live_data['m30'] = live_data['m1'].resample(TFs['m30'])
+		live_data.update(live_data['m1'].resample_many([TFs['m5'], TFs['m30']]))
 
 		# set and prepare indicators for timeframes
 		live_data['m1'].set_indicators(indicator_info)
@@ -184,17 +185,27 @@ class TesterLive:
 		live_data['m1'].set_strategies(strategy_info)
 		live_data['m1'].prepare_strategies()
 
+		# updates are fed as packed numpy records, the way a feed handler would decode binary bar messages
+		records = np.empty(len(df_update), dtype=ohlc_record_dtype)
+		records['date'] = df_update.index.values
+		for f in ohlc_record_dtype.names[1:]:
+			records[f] = df_update[f].to_numpy()
+
+		# zero-copy view of the latest m1 values that we check for signals
+		signal = live_data['m1'].row_view(['date', 'stratrsi_size'])
+		
 		start_time = time.time()
 		
-		for i, update_m1 in df_update.iterrows():
-			#print("Updating", update_m1.name)
+		for update_m1 in records:
+			#print("Updating", update_m1['date'])
 			
 			# update ohlc data for m1
-			live_data['m1'].update(update_m1)
+			live_data['m1'].update_record(update_m1)
 			
 			# create HTF update through resampling
-			update_m5 = live_data['m1'].resample(TFs['m5'], update=True)
-			update_m30 = live_data['m1'].resample(TFs['m30'], update=True)
+			updates = live_data['m1'].resample_many([TFs['m5'], TFs['m30']], update=True)
+			update_m5 = updates['m5']
+			update_m30 = updates['m30']
 			
 			# upate ohlc data for HTF
 			live_data['m5'].update(update_m5)
@@ -213,9 +224,8 @@ class TesterLive:
 			live_data['m1'].update_strategies()
 			
 			# check if we have gotten a entry signal from our strategy
-			row = live_data['m1'].get_row_range(range(-1,0), date_as_datetime=True, tz_convert=True, as_dict=True)
-			if row[0]['stratrsi_size'] != 0:
-				print("Trade signal")
+			if signal.stratrsi_size != 0:
+				print("Trade signal", signal.datetime())
 				
 				# in comparison to sim trading, we are continuously updating higher timeframes (m5)
 				# while getting m1 updates. Since m5 indicators are part of our strategy, we may want to await
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from .indicator_root import IndicatorRoot
+from .indicator_utils import get_lookback
 from .indicator_basic import IndicatorBasic_, IndicatorBasic, IndicatorBasic_feature_info
 from .indicator_mas import IndicatorMAs_, IndicatorMAs, IndicatorMAs_feature_info
 from .indicator_rsi import IndicatorRSI_, IndicatorRSI, IndicatorRSI_feature_info
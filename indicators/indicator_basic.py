@@ -1,40 +1,11 @@
 
 
 from .indicator_root import IndicatorRoot
-from .indicator_utils import indicator_strategy_vbt_caller
+from .indicator_utils import indicator_strategy_vbt_caller, run_counts
 import numpy as np
-import pandas as pd
-from vbt_sim_live import vectorbtpro_helpers as vbth
+from vbt_sim_live.tz_offsets import TzOffsets, get_tz_offsets, time_of_day_hm, NS_PER_DAY
 import vectorbtpro as vbt
 
-def find_runs(x):
-    """Find runs of consecutive items in an array."""
-
-    # ensure array
-    x = np.asanyarray(x)
-    if x.ndim != 1:
-        raise ValueError('only 1D array supported')
-    n = x.shape[0]
-
-    # handle empty array
-    if n == 0:
-        return np.array([]), np.array([]), np.array([])
-
-    else:
-        # find run starts
-        loc_run_start = np.empty(n, dtype=bool)
-        loc_run_start[0] = True
-        np.not_equal(x[:-1], x[1:], out=loc_run_start[1:])
-        run_starts = np.nonzero(loc_run_start)[0]
-
-        # find run values
-        run_values = x[loc_run_start]
-
-        # find run lengths
-        run_lengths = np.diff(np.append(run_starts, n))
-
-        return run_values, run_starts, run_lengths
-
 # Feature definition, including types for creating np arrays and default values
 IndicatorBasic_feature_info = [
 	{'name':'body_high', 'type':float, 'type_np':np.float64, 'default':np.nan},
@@ -78,41 +49,36 @@ class IndicatorBasic_(IndicatorRoot):
 		self.wick_high_pct = self.wick_high / self.range*100.0
 		self.wick_low_pct = self.wick_low / self.range*100.0
 			
-		# extdatanew class (live) will deliver a numpy array, while vbt.data (simulation) will deliver a datetimeindex , tz-aware
-		if isinstance(self.date, np.ndarray):		
-			t = pd.DatetimeIndex(self.date, tz='utc').tz_convert(self.tz)
-		else:
-			t = self.date
+		# local time of day and day index, derived from a table of UTC offset transitions of the timezone with integer arithmetic
+		# extdatanew class (live) will deliver a numpy array, while vbt.data (simulation) may deliver a datetimeindex, tz-aware
+		days, tzi = get_tz_offsets(self.tz).local_time(self.date)
 
 		# int value showing the candles timestamp as time of day, e.g. 930 for 09:30
-		# if we dont do np.array() we get "Index does not support mutable operations" later during update()
-		# this will ensure that we do not have a DatetimeIndex anymore, which would be immutable
-		hm = t.hour*100 + t.minute
-		self.date_hm = np.array(hm, dtype=np.int_) 
+		self.date_hm = np.array(time_of_day_hm(tzi), dtype=np.int_) 
 
 		# index of candle in seconds for current day			
-		tzi = t.hour*3600 + t.minute * 60 + t.second
 		self.date_tz_i = np.array(tzi, dtype=np.int_)
 
-		# whether candle is in extended hours or pre market hours
-		if self.timeframe.is_intraday():
-			self.ext = (tzi < 34200) | (tzi >= 57600)
-			self.pre = (tzi < 34200)
-
-		#print(self.timeframe.is_intraday(), self.ext)
+		# index of the current day with respect to Unix Epoch, for date_l without timezone conversion
+		self.date_tz_d = np.array(days, dtype=np.int_)
+		self.date_tz_dl = np.array(TzOffsets.as_int64(self.date_l) // NS_PER_DAY, dtype=np.int_)
 
-		# index of the current day with respect to Unix Epoch
-		tl = pd.DatetimeIndex(self.date_l)
-		self.date_tz_d = vbth.get_unix_day_from_datetime(t.tz_localize(None))	
-		self.date_tz_dl = vbth.get_unix_day_from_datetime(tl.tz_localize(None))
+		# whether candle is in extended hours or pre market hours, the session closes early on half days of the calendar
+		if self.timeframe.is_intraday():
+			calendar = self.kwargs.get('calendar')
+			if calendar is None:
+				self.ext = (tzi < 34200) | (tzi >= 57600)
+				self.pre = (tzi < 34200)
+			else:
+				self.ext = np.asarray(calendar.is_extended(tzi, self.date_tz_d))
+				self.pre = np.asarray(tzi < calendar.session_open)
 
 		# candle color as 1 (green) or -1 (red)
 		self.col[self.close > self.open] = 1
 		self.col[self.close < self.open] = -1
 		
 		# number of consecutive colors in a row
-		run_lengths = find_runs(self.col)[2]
-		self.num_col = np.array([i+1 for r in run_lengths for i in range(r)])
+		self.num_col = run_counts(self.col)
 
 	def update(self):
 		
@@ -126,19 +92,22 @@ class IndicatorBasic_(IndicatorRoot):
 		self.wick_high_pct[-1] = self.wick_high[-1] / self.range[-1]*100.0
 		self.wick_low_pct[-1] = self.wick_low[-1] / self.range[-1]*100.0
 			
-		t = pd.Timestamp(self.date[-1], tz='utc').tz_convert(self.tz)
-		tzi = t.hour*3600 + t.minute * 60 + t.second
+		day, tzi = get_tz_offsets(self.tz).local_time_single(self.date[-1])
 
-		self.date_hm[-1] = t.hour * 100 + t.minute 
+		self.date_hm[-1] = time_of_day_hm(tzi)
 		self.date_tz_i[-1] = tzi
 
-		if self.timeframe.is_intraday():
-			self.ext[-1] = (tzi < 34200) | (tzi >= 57600)
-			self.pre[-1] = (tzi < 34200)
+		self.date_tz_d[-1] = day
+		self.date_tz_dl[-1] = TzOffsets.as_int64(self.date_l[-1]) // NS_PER_DAY
 
-		tl = pd.Timestamp(self.date_l[-1])
-		self.date_tz_d[-1] = vbth.get_unix_day_from_datetime(t.tz_localize(None))		
-		self.date_tz_dl[-1] = vbth.get_unix_day_from_datetime(tl.tz_localize(None))
+		if self.timeframe.is_intraday():
+			calendar = self.kwargs.get('calendar')
+			if calendar is None:
+				self.ext[-1] = (tzi < 34200) | (tzi >= 57600)
+				self.pre[-1] = (tzi < 34200)
+			else:
+				self.ext[-1] = calendar.is_extended(tzi, self.date_tz_d[-1])
+				self.pre[-1] = tzi < calendar.session_open
 
 		self.col[-1] = 1 if self.close[-1] > self.open[-1] else -1 if self.close[-1] < self.open[-1] else 0
 
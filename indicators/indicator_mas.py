@@ -1,7 +1,7 @@
 
 
 from .indicator_root import IndicatorRoot
-from .indicator_utils import indicator_strategy_vbt_caller
+from .indicator_utils import indicator_strategy_vbt_caller, RunningEMA, RunningSMA
 import numpy as np
 import talib
 import vectorbtpro as vbt
@@ -29,33 +29,64 @@ class IndicatorMAs_(IndicatorRoot):
 	def __init__(self, input_args, kwargs):
 		super().__init__(input_args, kwargs)
 
+	@classmethod
+	def lookback(cls, params, timeframe):
+		# EMA needs about 5 periods to converge from its SMA seed (error below 1e-4 of the seed difference)
+		return 5*200
+
 	def prepare(self):
-		self.e9 = talib.EMA(self.close, 9)
-		self.e20 = talib.EMA(self.close, 20)
-		self.e50 = talib.EMA(self.close, 50)
-		self.e100 = talib.EMA(self.close, 100)
-		self.e200 = talib.EMA(self.close, 200)
-
-		self.s9 = talib.SMA(self.close, 9)
-		self.s20 = talib.SMA(self.close, 20)
-		self.s30 = talib.SMA(self.close, 30)
-		self.s50 = talib.SMA(self.close, 50)
-		self.s100 = talib.SMA(self.close, 100)
-		self.s200 = talib.SMA(self.close, 200)
+		# talib requires float64, independent of the dtype prices are stored with
+		close = np.asarray(self.close, dtype=np.float64)
+		
+		self.e9 = talib.EMA(close, 9)
+		self.e20 = talib.EMA(close, 20)
+		self.e50 = talib.EMA(close, 50)
+		self.e100 = talib.EMA(close, 100)
+		self.e200 = talib.EMA(close, 200)
+
+		self.s9 = talib.SMA(close, 9)
+		self.s20 = talib.SMA(close, 20)
+		self.s30 = talib.SMA(close, 30)
+		self.s50 = talib.SMA(close, 50)
+		self.s100 = talib.SMA(close, 100)
+		self.s200 = talib.SMA(close, 200)
+		
+		# running state per output name for updates, seeded from the float64 results
+		self.running = {}
+		
+		for p in [9, 20, 50, 100, 200]:
+			self.running['e' + str(p)] = RunningEMA(p)
+			self.running['e' + str(p)].seed(self.__dict__['e' + str(p)])
+			
+		for p in [9, 20, 30, 50, 100, 200]:
+			self.running['s' + str(p)] = RunningSMA(p)
+			self.running['s' + str(p)].seed(close)
+
+	def on_roll(self, n):
+		for r in self.running.values():
+			r.roll(n)
+			
+	def on_rewind(self):
+		# the EMA keeps its committed states in float64, the stored EMA may have less precision (see DtypePolicy)
+		close = np.asarray(self.close, dtype=np.float64)
+		for n, r in self.running.items():
+			if isinstance(r, RunningEMA):
+				r.rewind(self.__dict__[n])
+			else:
+				r.seed(close)
 
 	def update(self):
-		self.e9[-1] = talib.EMA(self.close, 9)[-1]
-		self.e20[-1] = talib.EMA(self.close, 20)[-1]
-		self.e50[-1] = talib.EMA(self.close, 50)[-1]
-		self.e100[-1] = talib.EMA(self.close, 100)[-1]
-		self.e200[-1] = talib.EMA(self.close, 200)[-1]
-
-		self.s9[-1] = talib.SMA(self.close, 9)[-1]
-		self.s20[-1] = talib.SMA(self.close, 20)[-1]
-		self.s30[-1] = talib.SMA(self.close, 30)[-1]
-		self.s50[-1] = talib.SMA(self.close, 50)[-1]
-		self.s100[-1] = talib.SMA(self.close, 100)[-1]
-		self.s200[-1] = talib.SMA(self.close, 200)[-1]
+		# the latest values are calculated from the running state, and with talib only as long as there is no valid state
+		for n, r in self.running.items():
+			value = r.update(self.close)
+			
+			if np.isnan(value):
+				close = np.asarray(self.close, dtype=np.float64)
+				values = talib.EMA(close, r.period) if isinstance(r, RunningEMA) else talib.SMA(close, r.period)
+				r.seed(values if isinstance(r, RunningEMA) else close)
+				value = values[-1]
+				
+			self.__dict__[n][-1] = value
 
 # VBT class for indicator, holding the input, param and output definitions
 IndicatorMAs = vbt.IF(
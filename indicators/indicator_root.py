@@ -9,6 +9,10 @@ class IndicatorRoot:
 	 and additional information that may be supplied (e.g. support and resistance lines as part of kwargs)
 	 
 	"""
+	
+	# values of params that can be omitted in indicator info
+	param_defaults = {}
+	
 	def __init__(self, input_args, kwargs):
 		
 		# re-engineer input, param and output names from the corresponding vbt class
@@ -44,13 +48,45 @@ class IndicatorRoot:
 		self.create_features()
 	
 	
+	@classmethod
+	def lookback(cls, params: dict, timeframe) -> int:
+		"""
+		return the number of candles an indicator needs to look back for its latest value to be accurate,
+		given the indicator params (as in indicator info). Indicators override this accordingly.
+		"""
+		return 1
+		
 	def create_features(self):
 		"""
 		create numpy arrays of specific length, filled with default values,
-		and set the feature name as attribute for the indicator class
+		and set the feature name as attribute for the indicator class.
+		When run by LiveData, the arrays are taken from its feature store instead.
+		A dtype policy given in kwargs defines the dtypes of the arrays.
 		"""		
+		live_data = self.kwargs.get('live_data')
+		dtype_policy = self.kwargs.get('dtype_policy')
+		
 		for f in self.feature_info:
-			self.__dict__[f['name'] ] = np.full(self.length, f['default'] , dtype=f['type_np'] )		
+			if live_data is not None and live_data.has_feature(f['name']):
+				self.__dict__[f['name'] ] = live_data.get_feature(f['name'])
+			else:
+				dtype = f['type_np'] if dtype_policy is None else dtype_policy.dtype(f)
+				self.__dict__[f['name'] ] = np.full(self.length, f['default'] , dtype=dtype )		
+		
+	def on_roll(self, n: int):
+		"""
+		called by LiveData once n new candles have opened, before the next update. Indicators that keep running state
+		override this to commit the state of the previous candles.
+		"""
+		pass
+		
+	def on_rewind(self):
+		"""
+		called by LiveData once the arrays end at an earlier candle (see LiveData.rewind()), before the candles after it are
+		replayed. Indicators that keep running state override this to rebuild the state of the candles before the latest one
+		from the stored values.
+		"""
+		pass
 		
 	def get(self):
 		""" return list of numpy arrays with order of indicator's output names"""
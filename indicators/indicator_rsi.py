@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from .indicator_root import IndicatorRoot
-from .indicator_utils import indicator_strategy_vbt_caller
+from .indicator_utils import indicator_strategy_vbt_caller, RunningRSI
 import numpy as np
 import talib
 import vectorbtpro as vbt
@@ -13,16 +13,42 @@ IndicatorRSI_feature_info = [
 		
 class IndicatorRSI_(IndicatorRoot):
 	
-	"""Indicator to calculate RSI based on talib library"""
+	"""Indicator to calculate RSI based on talib library, updates are calculated from running state (see RunningRSI)"""
 	
 	def __init__(self, input_args, kwargs):
 		super().__init__(input_args, kwargs)
 		
+	@classmethod
+	def lookback(cls, params, timeframe):
+		# Wilder smoothing needs about 10 periods to converge (error below 1e-4 of the seed difference)
+		return 10*params['period']
+		
 	def prepare(self):
-		self.rsi = talib.RSI(self.close, self.period)
+		# talib requires float64, independent of the dtype prices are stored with
+		close = np.asarray(self.close, dtype=np.float64)
+		self.rsi = talib.RSI(close, self.period)
+		
+		# live data is updated from running state, seeded here (sim data is never updated)
+		self.running = RunningRSI(self.period)
+		if self.kwargs.get('live_data') is not None:
+			self.running.seed(close)
+		
+	def on_roll(self, n):
+		self.running.roll(n)
+		
+	def on_rewind(self):
+		self.running.seed(np.asarray(self.close, dtype=np.float64))
 		
 	def update(self):
-		self.rsi[-1] = talib.RSI(self.close, self.period)[-1]
+		value = self.running.update(self.close)
+		
+		# talib only as long as there is no valid state
+		if np.isnan(value):
+			close = np.asarray(self.close, dtype=np.float64)
+			self.running.seed(close)
+			value = talib.RSI(close, self.period)[-1]
+			
+		self.rsi[-1] = value
 
 # VBT class for indicator, holding the input, param and output definitions
 IndicatorRSI = vbt.IF(
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import numpy as np
+from collections import deque
 import indicators as inst
 
 
@@ -15,6 +16,13 @@ def indicator_strategy_vbt_caller(*input_args, **kwargs):
 	ih.prepare()
 	return ih.get()
 
+def get_lookback(info: dict, timeframe) -> int:
+
+	""" helper function to return the largest lookback of all indicators (or strategies) given in info of one timeframe,
+	e.g. {'IndicatorRSI': {'period': 14}, 'IndicatorMAs': {}}
+	"""
+	return max([getattr(inst, name + "_").lookback(params, timeframe) for name, params in info.items()], default=1)
+
 def get_strategy_standard_output_names(short_name):
 
 	""" helper function to create standard strategy output names based on the strategy's short name"""
@@ -31,4 +39,245 @@ def get_strategy_feature_info(short_name):
 		{'name':short_name+'_stoploss', 'type':float, 'type_np':np.float64, 'default':np.nan},
 		{'name':short_name+'_profit', 'type':float, 'type_np':np.float64, 'default':np.nan},
 		{'name':short_name+'_cancel_order', 'type':bool, 'type_np':np.bool_, 'default':None},
-	]
\ No newline at end of file
+	]
+
+def find_runs(x):
+	"""Find runs of consecutive items in an array."""
+
+	# ensure array
+	x = np.asanyarray(x)
+	if x.ndim != 1:
+		raise ValueError('only 1D array supported')
+	n = x.shape[0]
+
+	# handle empty array
+	if n == 0:
+		return np.array([]), np.array([]), np.array([])
+
+	else:
+		# find run starts
+		loc_run_start = np.empty(n, dtype=bool)
+		loc_run_start[0] = True
+		np.not_equal(x[:-1], x[1:], out=loc_run_start[1:])
+		run_starts = np.nonzero(loc_run_start)[0]
+
+		# find run values
+		run_values = x[loc_run_start]
+
+		# find run lengths
+		run_lengths = np.diff(np.append(run_starts, n))
+
+		return run_values, run_starts, run_lengths
+
+def run_counts(x) -> np.ndarray:
+
+	"""Return the position of each item within its run of consecutive equal items (see find_runs()), starting at 1, 
+	e.g. the number of consecutive candles of the same color (num_col of IndicatorBasic). Vectorized, O(n)."""
+
+	x = np.asanyarray(x)
+	if not len(x):
+		return np.zeros(0, dtype=np.int_)
+
+	run_starts, run_lengths = find_runs(x)[1:]
+	return np.arange(1, len(x) + 1) - np.repeat(run_starts, run_lengths)
+
+def count_consecutive(cond) -> np.ndarray:
+
+	"""Return the number of consecutive items where cond is True up to each item, 0 where it is False,
+	e.g. count_consecutive(close > vwap) for the number of consecutive candles above VWAP. Vectorized, O(n)."""
+
+	cond = np.asarray(cond, dtype=np.bool_)
+	return np.where(cond, run_counts(cond), 0)
+
+class RunningEMA():
+
+	"""Keeps an EMA (talib definition, seeded with the SMA of the first period values) as running state, so that the value 
+	of the latest candle is calculated in O(1). The state holds the EMA up to the candle before the latest one (committed),
+	the latest candle is in progress and re-calculated from the committed state on every update.
+	The committed states of the candles in the buffer are kept in float64 as well, so that the state can be rewound
+	to an earlier candle (see rewind()) independent of the dtype the EMA is stored with.
+	
+	alpha: smoothing factor, 2/(period+1) by default, 1/period gives Wilder smoothing
+	"""
+
+	def __init__(self, period: int, alpha: float = None):
+		self.period = period
+		self.alpha = 2.0 / (period + 1) if alpha is None else alpha
+		self.committed = np.nan
+		self.pending = 0
+		self.history = deque()
+		self.length = 0
+
+	def seed(self, ema: np.ndarray) -> None:
+
+		"""Set the state from a fully calculated (float64) EMA array."""
+
+		self.committed = float(ema[-2]) if len(ema) > 1 else np.nan
+		self.pending = 0
+		self.history = deque(np.asarray(ema[:-1], dtype=np.float64).tolist(), maxlen=max(len(ema), 1))
+		self.length = len(ema)
+
+	def rewind(self, ema: np.ndarray) -> None:
+
+		"""Set the state for the EMA array ema that ends at an earlier candle than at the last update, from the committed 
+		states kept since then, or from ema itself (see seed()) if these do not reach back far enough."""
+
+		n = self.length - len(ema)
+
+		if self.pending or n < 0 or n >= len(self.history) or len(ema) < 2:
+			self.seed(ema)
+			return
+
+		for i in range(n):
+			self.history.pop()
+
+		self.committed = self.history[-1]
+		self.length = len(ema)
+
+	def roll(self, n: int = 1) -> None:
+
+		"""Register n new candles, the candles before them are committed with their final values on the next update."""
+
+		self.pending += n
+
+	def update(self, values: np.ndarray) -> float:
+
+		"""Return the EMA of the latest value, or NaN if the state needs to be seeded again (see seed())."""
+
+		if self.pending:
+			if self.pending >= len(values):
+				# the committed values have been rolled out of the buffer
+				self.committed = np.nan
+				self.history.clear()
+			else:
+				for j in range(self.pending, 0, -1):
+					self.committed += self.alpha * (float(values[-1-j]) - self.committed)
+					self.history.append(self.committed)
+
+			self.pending = 0
+
+		self.length = len(values)
+		return self.committed + self.alpha * (float(values[-1]) - self.committed)
+
+class RunningSMA():
+
+	"""Keeps the rolling sum of an SMA as running state, so that the value of the latest candle is calculated in O(1).
+	The sum covers the period-1 committed values before the latest one. It is re-calculated from the values once 
+	every period steps, so rounding errors cannot accumulate.
+	"""
+
+	def __init__(self, period: int):
+		self.period = period
+		self.committed = np.nan
+		self.pending = 0
+		self.steps = 0
+
+	def seed(self, values: np.ndarray) -> None:
+
+		"""Set the state from the (float64) values."""
+
+		self.committed = float(np.sum(values[-self.period:-1])) if len(values) >= self.period else np.nan
+		self.pending = 0
+		self.steps = 0
+
+	def roll(self, n: int = 1) -> None:
+
+		"""Register n new candles, see RunningEMA.roll()."""
+
+		self.pending += n
+
+	def update(self, values: np.ndarray) -> float:
+
+		"""Return the SMA of the latest value, or NaN if there are not enough values."""
+
+		if self.pending:
+			m = self.pending
+			self.steps += m
+
+			if self.steps >= self.period or len(values) < self.period + m:
+				self.seed(values)
+			else:
+				self.committed += float(np.sum(values[-1-m:-1], dtype=np.float64) - np.sum(values[-self.period-m:-self.period], dtype=np.float64))
+				self.pending = 0
+
+		return (self.committed + float(values[-1])) / self.period
+
+class RunningRSI():
+
+	"""Keeps the Wilder smoothed average gain and loss of an RSI (talib definition) as running state, so that the RSI of
+	the latest candle is calculated in O(1), see RunningEMA for committed and in-progress candles.
+	The state is seeded with the same operations as talib.RSI, so updates continue its values exactly.
+	"""
+
+	def __init__(self, period: int):
+		self.period = period
+		self.gain = np.nan
+		self.loss = np.nan
+		self.pending = 0
+
+	def seed(self, values: np.ndarray) -> None:
+
+		"""Set the state from the (float64) values, up to the candle before the latest one. This is O(n) in the number of values."""
+
+		self.gain = np.nan
+		self.loss = np.nan
+		self.pending = 0
+
+		p = self.period
+		diff = np.diff(values[:-1]).tolist()
+
+		if len(diff) < p:
+			return
+
+		gain = sum(d for d in diff[:p] if d > 0) / p
+		loss = sum(-d for d in diff[:p] if d < 0) / p
+
+		for d in diff[p:]:
+			gain, loss = self.smooth(gain, loss, d)
+
+		self.gain, self.loss = gain, loss
+
+	def smooth(self, gain: float, loss: float, d: float) -> tuple:
+
+		"""Return average gain and loss after a change d of the values."""
+
+		p = self.period
+		gain *= p - 1
+		loss *= p - 1
+
+		if d < 0:
+			loss -= d
+		else:
+			gain += d
+
+		return gain / p, loss / p
+
+	def roll(self, n: int = 1) -> None:
+
+		"""Register n new candles, see RunningEMA.roll()."""
+
+		self.pending += n
+
+	def update(self, values: np.ndarray) -> float:
+
+		"""Return the RSI of the latest value, or NaN if the state needs to be seeded again (see seed())."""
+
+		if self.pending:
+			if self.pending + 1 >= len(values):
+				# the committed values have been rolled out of the buffer
+				self.gain = np.nan
+			else:
+				for j in range(self.pending, 0, -1):
+					self.gain, self.loss = self.smooth(self.gain, self.loss, float(values[-1-j]) - float(values[-2-j]))
+
+			self.pending = 0
+
+		if len(values) < 2:
+			return np.nan
+
+		gain, loss = self.smooth(self.gain, self.loss, float(values[-1]) - float(values[-2]))
+
+		if np.isnan(gain):
+			return np.nan
+
+		return 100 * (gain / (gain + loss)) if not -1e-8 < gain + loss < 1e-8 else 0.0
@@ -5,41 +5,51 @@ from .indicator_utils import indicator_strategy_vbt_caller
 import numpy as np
 import vectorbtpro as vbt
 
-def intervaled_cumsum(ar: np.array, sizes: np.array):
-	""" Calculate the cumulative sum based on input array ar and bins given in sizes"""	
-	# Make a copy to be used as output array
-	out = ar.copy()
-	
-	# Get cumumlative values of array
-	arc = ar.cumsum()
-
-	# Get cumsumed indices to be used to place differentiated values into
-	# inp array's copy
-	idx = sizes.cumsum()
+def anchored_cumsum(ar: np.array, starts: np.array):
+	""" Calculate the cumulative sum of input array ar, restarting at the indices given in starts (sorted, including 0).
+	Each period is summed on its own, so the sums are exactly those of adding up the values one by one.
+	"""
+	out = np.empty_like(ar)
+	for s, e in zip(starts, np.append(starts[1:], len(ar))):
+		np.cumsum(ar[s:e], out=out[s:e])
+	return out
 
-	# Place differentiated values that when cumumlatively summed later on would
-	# give us the desired intervaled cumsum
-	out[idx[0]] = ar[idx[0]] - arc[idx[0]-1]
-	out[idx[1:-1]] = ar[idx[1:-1]] - np.diff(arc[idx[:-1]-1])
-	return out.cumsum() 
+def vwap_anchor_keys(date_tz_d, pre, anchor):
+	
+	""" key of the VWAP period each candle belongs to, periods start at midnight (anchor 'day') or at the session open 
+	(anchor 'open'), where candles before the open belong to the period of the previous day
+	"""
+	
+	if anchor == 'open':
+		return np.asarray(date_tz_d, dtype=np.int64) - np.asarray(pre, dtype=np.int64)
+	elif anchor == 'day':
+		return np.asarray(date_tz_d, dtype=np.int64)
+	
+	raise Exception("Invalid VWAP anchor, needs to be 'day' or 'open', not", anchor)
 	
-def indicator_vwap_func(high, low, close, vol, date_tz_d):
+def indicator_vwap_func(high, low, close, vol, keys, include):
 	
-	""" vwap formula """
+	""" vwap formula, returns vwap based on HLC and vwap2 based on HL, as well as the cumulative sums they are calculated from.
+	vwap and vwap2 are NaN while the period has no included volume yet, e.g. premarket candles with rth_only
+	"""
 	# reduce volume to avoid RuntimeWarning: overflow encountered in ulonglong_scalars
-	volume = vol / 1000
+	# accumulate in float64, independent of the dtype prices are stored with
+	volume = np.asarray(vol, dtype=np.float64) / 1000
+	high = np.asarray(high, dtype=np.float64)
+	low = np.asarray(low, dtype=np.float64)
+	close = np.asarray(close, dtype=np.float64)
+	
+	if include is not None:
+		volume = np.where(include, volume, 0)
 	
-	# calculate vwap
-	sizes = np.bincount(date_tz_d)
-	sizes = sizes[sizes != 0]
-	vold = intervaled_cumsum(volume, sizes)
-	vold[vold == 0] = 1
+	# calculate vwap, accumulating over each period
+	starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+	vold = anchored_cumsum(volume, starts)
+	vp = anchored_cumsum(volume*(high + low + close)/3, starts)
+	vp2 = anchored_cumsum(volume*(high + low)/2, starts)
 	
-	if close is None:
-		volume_price = volume*(high + low)/2 
-	else:
-		volume_price = volume*(high + low + close)/3 
-	return intervaled_cumsum(volume_price, sizes) / vold
+	vold_div = np.where(vold == 0, 1, vold)
+	return np.where(vold == 0, np.nan, vp / vold_div), np.where(vold == 0, np.nan, vp2 / vold_div), vold, vp, vp2
 
 # Feature definition, including types for creating np arrays and default values
 IndicatorVWAP_feature_info = [
@@ -52,26 +62,87 @@ class IndicatorVWAP_(IndicatorRoot):
 	"""Indicator to calculate two types of VWAP
 	vwap based on HLC
 	vwap2 based on HL
+	
+	anchor: 'day' to start each VWAP at midnight, 'open' to start it at the session open (09:30)
+	rth_only: disregard candles in extended hours (see ext of IndicatorBasic), these show the VWAP of the period so far,
+		or NaN before the first candle of the regular session
+	
+	Updates are O(1): the cumulative volume and volume*price of the period up to the committed candles are kept as state,
+	the in-progress candle is added to them on every update.
 	"""
 	
+	param_defaults = {'anchor': 'day', 'rth_only': False}
+	
 	def __init__(self, input_args, kwargs):
 		super().__init__(input_args, kwargs)
 		
+	@classmethod
+	def lookback(cls, params, timeframe):
+		# needs the entire current day
+		return 24*60*60 // timeframe.value if timeframe.is_intraday() else 1
+		
+	def include(self):
+		return ~np.asarray(self.ext, dtype=np.bool_) if self.rth_only else None
+		
 	def prepare(self):
-		self.vwap = indicator_vwap_func(self.high, self.low, self.close, self.volume, self.date_tz_d)
-		self.vwap2 = indicator_vwap_func(self.high, self.low, None, self.volume, self.date_tz_d)
+		self.vwap, self.vwap2 = self.seed()
+		
+	def seed(self) -> tuple:
+		
+		""" calculate vwap and vwap2 over all candles and set the state of the committed candles (all but the latest one) """
+		
+		keys = vwap_anchor_keys(self.date_tz_d, self.pre, self.anchor)
+		vwap, vwap2, vold, vp, vp2 = indicator_vwap_func(self.high, self.low, self.close, self.volume, keys, self.include())
+		
+		self.pending = 0
+		if len(keys) > 1:
+			self.state = (keys[-2], vold[-2], vp[-2], vp2[-2])
+		else:
+			self.state = (None, 0.0, 0.0, 0.0)
+			
+		return vwap, vwap2
+		
+	def on_roll(self, n):
+		self.pending += n
+		
+	def on_rewind(self):
+		self.seed()
+		
+	def add(self, state: tuple, i: int) -> tuple:
+		
+		""" return the state after candle i has been added to it """
+		
+		key = vwap_anchor_keys(self.date_tz_d[i], self.pre[i], self.anchor)
+		key_state, vold, vp, vp2 = state if key == state[0] else (key, 0.0, 0.0, 0.0)
+		
+		if self.rth_only and self.ext[i]:
+			return key_state, vold, vp, vp2
+			
+		volume = float(self.volume[i]) / 1000
+		high, low, close = float(self.high[i]), float(self.low[i]), float(self.close[i])
+		return key_state, vold + volume, vp + volume*(high + low + close)/3, vp2 + volume*(high + low)/2
 		
 	def update(self):
-		self.vwap[-1] = indicator_vwap_func(self.high, self.low, self.close, self.volume, self.date_tz_d)[-1]
-		self.vwap2[-1] = indicator_vwap_func(self.high, self.low, None, self.volume, self.date_tz_d)[-1]
+		if self.pending:
+			if self.pending >= len(self.close):
+				self.seed()
+			else:
+				for j in range(self.pending, 0, -1):
+					self.state = self.add(self.state, -1-j)
+				self.pending = 0
+			
+		key, vold, vp, vp2 = self.add(self.state, -1)
+		
+		self.vwap[-1] = vp / vold if vold else np.nan
+		self.vwap2[-1] = vp2 / vold if vold else np.nan
 
 # VBT class for indicator, holding the input, param and output definitions
 IndicatorVWAP = vbt.IF(
 
 	class_name='IndicatorVWAP',
 	short_name='indvwap',
-	input_names=['high','low','close','volume','date_tz_d','ext'],
-	param_names=[],
+	input_names=['high','low','close','volume','date_tz_d','ext','pre'],
+	param_names=['anchor','rth_only'],
 	output_names=['vwap','vwap2'],
 
 ).with_apply_func(
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# same as examples/_setpath.py, the packages are used from the repository
+root = Path(__file__).resolve().parent.parent
+sys.path.append(str(root))
+
+pytest.importorskip('talib')
+pytest.importorskip('vectorbtpro')
+
+from vbt_sim_live import GenericData, LiveData, TFs
+
+examples = root.joinpath('examples')
+
+indicator_info = {tf: {
+		'IndicatorRSI': {'period': 14},
+		'IndicatorBasic': {},
+		'IndicatorMAs': {},
+		'IndicatorVWAP': {},
+	} for tf in ['m1', 'm5', 'm30', 'd1', 'w1', 'M1']}
+
+strategy_info = {
+	'm1': {
+		'StrategyRSI': {
+			'threshold_high': 70,
+			'threshold_low': 30,
+			'order_type': 'limit',
+			'profit_rr': 3,
+			'min_risk': 0.1,
+			'risk_per_trade': 500
+			},
+		},
+	}
+
+realign_info = [
+	{'align': 'close', 'feature': 'rsi', 'from': 'm5', 'to': 'm1'},
+	{'align': 'close', 'feature': 's20', 'from': 'm5', 'to': 'm1'},
+	{'align': 'close', 'feature': 's200', 'from': 'm5', 'to': 'm1'},
+	{'align': 'close', 'feature': 's20', 'from': 'm30', 'to': 'm1'},
+	{'align': 'close', 'feature': 's200', 'from': 'm30', 'to': 'm1'},
+]
+
+@pytest.fixture(scope='session')
+def minute_df() -> pd.DataFrame:
+	return GenericData.df_ensure_format(pd.read_csv(examples.joinpath('OHLC_Test_Minute_Data.csv')))
+
+def make_minute(df: pd.DataFrame, **kwargs) -> dict:
+
+	"""Return m1 LiveData with m5 and m30 dependents, prepared indicators, realignment and strategies, as in the minute example."""
+
+	ld = {'m1': LiveData.from_df(df, 'NVDA', TFs['m1'], **kwargs)}
+	ld['m5'] = ld['m1'].resample(TFs['m5'])
+	ld['m30'] = ld['m1'].resample(TFs['m30'])
+
+	for ld_tf in ld.values():
+		ld_tf.set_indicators(indicator_info)
+		ld_tf.prepare_indicators()
+
+	for tf in ['m5', 'm30']:
+		ld['m1'].realign(ld[tf], realign_info)
+		ld['m1'].add_dependent(ld[tf], realign_info)
+
+	ld['m1'].set_strategies(strategy_info)
+	ld['m1'].prepare_strategies()
+	return ld
+
+def update_rows(ld: dict, df: pd.DataFrame) -> None:
+
+	"""Update m1 with the rows of df one by one and cascade each update, as in the minute example."""
+
+	for i, row in df.iterrows():
+		ld['m1'].update(row)
+		ld['m1'].cascade()
+
+def assert_same_data(a: dict, b: dict, rtol: float = 1e-9) -> None:
+
+	"""Assert that all features of LiveData per timeframe are the same, up to rounding for floats."""
+
+	for tf in a:
+		df_a, df_b = a[tf].to_df(), b[tf].to_df()
+		assert list(df_a.columns) == list(df_b.columns), tf
+		assert (df_a.index == df_b.index).all(), tf
+
+		for c in df_a.columns:
+			va, vb = df_a[c].to_numpy(), df_b[c].to_numpy()
+			if va.dtype.kind == 'f':
+				assert pd.isna(va).tolist() == pd.isna(vb).tolist(), (tf, c)
+				assert abs(va - vb)[~pd.isna(va)].max(initial=0) <= rtol * (1 + abs(va)[~pd.isna(va)].max(initial=0)), (tf, c)
+			else:
+				assert (va == vb).all(), (tf, c)
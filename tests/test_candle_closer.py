@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from vbt_sim_live import CandleCloser
+
+from conftest import make_minute, update_rows, assert_same_data
+
+def in_progress(minute_df, end: int):
+	# rows up to the middle of an m5 candle, the latest one is still in progress
+	df = minute_df[:end].copy()
+	df.loc[df.index[-1], 'cpl'] = False
+	return df
+
+def find_mid_m5(minute_df) -> int:
+	minutes = minute_df.index.minute.to_numpy()
+	# the next row is in the same m5 candle, one minute later
+	return int(np.flatnonzero((minutes[:-1] % 5 == 1) & (np.diff(minute_df.index.values) == np.timedelta64(60, 's')))[-20]) + 1
+
+def test_close_same_as_complete_row(minute_df):
+	end = find_mid_m5(minute_df)
+	date = minute_df.index.values[end-1]
+
+	closed = make_minute(in_progress(minute_df, end))
+	now = [date]
+	closer = CandleCloser(grace=2, clock=lambda: now[0])
+	closer.register(closed['m1'])
+
+	assert closer.next_deadline() == date + np.timedelta64(62, 's')
+	assert closer.poll() == []
+
+	# the m1 candle is closed as if its complete row had come in
+	now[0] = date + np.timedelta64(62, 's')
+	assert closer.poll() == [closed['m1']]
+
+	complete = make_minute(in_progress(minute_df, end))
+	update_rows(complete, minute_df[end-1:end])
+	assert_same_data(complete, closed, rtol=0)
+	assert not closed['m5'].data['cpl'][-1]
+
+	# the m5 candle is closed at the end of its period, and stays complete with a late row of the same period
+	m5_end = closed['m5'].data['date'][-1] + np.timedelta64(5*60 + 2, 's')
+	assert closer.next_deadline() == m5_end
+	now[0] = m5_end
+	assert closer.poll() == [closed['m5']]
+	assert closed['m5'].data['cpl'][-1] and not closed['m30'].data['cpl'][-1]
+
+	update_rows(closed, in_progress(minute_df, end+1)[-1:])
+	assert closed['m5'].data['cpl'][-1] and closed['m5'].data['date'][-1] == complete['m5'].data['date'][-1]
+
+def test_late_row_keeps_closed_candle_complete(minute_df):
+	end = find_mid_m5(minute_df)
+	date = minute_df.index.values[end-1]
+
+	ld = make_minute(in_progress(minute_df, end))
+	closer = CandleCloser(grace=2, clock=lambda: date + np.timedelta64(62, 's'))
+	closer.register(ld['m1'])
+	assert closer.poll() == [ld['m1']]
+
+	# a late in-progress row of the closed candle is applied, but does not open it again
+	late = in_progress(minute_df, end)[-1:]
+	late['close'] += 0.25
+	update_rows(ld, late)
+	assert ld['m1'].data['cpl'][-1] and ld['m1'].data['close'][-1] == late['close'].iloc[0]
+
+	# the next candle is in progress as usual
+	update_rows(ld, in_progress(minute_df, end+1)[-1:])
+	assert not ld['m1'].data['cpl'][-1] and ld['m1'].data['date'][-1] == minute_df.index.values[end]
+
+def test_run_polls_at_deadlines(minute_df):
+	end = find_mid_m5(minute_df)
+	ld = make_minute(in_progress(minute_df, end))
+	now = [minute_df.index.values[end-1]]
+	closer = CandleCloser(grace=0, clock=lambda: now[0])
+	closer.register(ld['m1'])
+
+	def sleep(seconds):
+		now[0] = now[0] + np.timedelta64(int(seconds * 10**9), 'ns')
+
+	# sleeps up to max_wait, then until the next deadline
+	closer.run(until=lambda: ld['m30'].data['cpl'][-1], max_wait=600, sleep=sleep)
+	assert ld['m1'].data['cpl'][-1] and ld['m5'].data['cpl'][-1]
+	assert now[0] == ld['m30'].data['date'][-1] + np.timedelta64(30*60, 's')
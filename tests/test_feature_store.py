@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from vbt_sim_live.feature_store import FeatureSchema, FeatureStore
+
+def make_store(ring_buffer: bool, slack: int = None) -> FeatureStore:
+	store = FeatureStore(10, ring_buffer=ring_buffer, slack=slack)
+	store.add('close', np.arange(10, dtype=np.float64))
+	store.add('volume', np.arange(10, dtype=np.int64) * 100)
+	store.add('cpl', np.ones(10, dtype=np.bool_))
+	return store
+
+def roll_and_write(store: FeatureStore, i: int, n: int) -> None:
+	store.roll(n)
+	views, m = store.views(), min(n, store.length)
+	views['close'][-m:] = np.arange(i, i+m)
+	views['volume'][-m:] = np.arange(i, i+m) * 100
+	views['cpl'][-1] = i % 3 == 0
+
+@pytest.mark.parametrize('slack', [None, 1, 3])
+def test_ring_buffer_same_as_shift(slack):
+	plain, ring = make_store(False), make_store(True, slack)
+
+	# single and multiple rolls, including those that use up the slack and move the window back
+	for i, n in enumerate([1, 1, 2, 1, 3, 1, 5, 1, 1, 9, 10, 12, 1]):
+		roll_and_write(plain, 100 + 20*i, n)
+		roll_and_write(ring, 100 + 20*i, n)
+
+		for name in ['close', 'volume', 'cpl']:
+			assert (plain.view(name) == ring.view(name)).all(), (i, name)
+
+def test_ring_buffer_views_version():
+	ring = make_store(True, slack=2)
+	version = ring.views_version
+
+	assert ring.roll(1) and ring.views_version > version
+	assert not make_store(False).roll(1)
+
+def test_locate_and_latest_column():
+	ring = make_store(True, slack=2)
+
+	# positions in the blocks stay valid across rolls, which move the views
+	for i in range(5):
+		roll_and_write(ring, 100 + i, 1)
+		dtype, row = ring.locate('close')
+		assert ring.blocks[dtype][row, ring.latest_column()] == ring.view('close')[-1] == 100 + i
+		assert ring.blocks[dtype][row, ring.latest_column(4)] == ring.view('close')[3]
+
+	with pytest.raises(Exception):
+		ring.locate('open')
+
+def test_roll_fills_new_slots_with_latest_value():
+	store = make_store(True, slack=1)
+	store.roll(3)
+
+	assert store.view('close').tolist() == [3, 4, 5, 6, 7, 8, 9, 9, 9, 9]
+
+def test_blocks_same_as_separate_arrays():
+	# more features per dtype than the initial block holds, so blocks grow in between
+	rng = np.random.default_rng(1)
+	arrays = {}
+	for i in range(9):
+		arrays[f'f{i}'] = rng.normal(size=10)
+		arrays[f'i{i}'] = rng.integers(0, 100, size=10)
+		arrays[f'b{i}'] = rng.integers(0, 2, size=10).astype(np.bool_)
+
+	store = FeatureStore(10)
+	for name, data in arrays.items():
+		store.add(name, data)
+
+	assert set(store.blocks.keys()) == {np.dtype(np.float64), np.dtype(np.int64), np.dtype(np.bool_)}
+	assert all(store.view(n).dtype == a.dtype and (store.view(n) == a).all() for n, a in arrays.items())
+
+	store.roll(3)
+	for name, data in arrays.items():
+		shifted = np.concatenate([data[3:], np.repeat(data[-1:], 3)])
+		assert (store.view(name) == shifted).all(), name
+
+def test_export_and_copy_are_independent():
+	store = make_store(True, slack=2)
+	exported, snapshot = store.export(['close']), store.copy()
+
+	store.roll(1)
+	store.view('close')[-1] = -1
+
+	assert list(exported.keys()) == ['close'] and exported['close'].tolist() == list(range(10))
+	assert snapshot.view('close').tolist() == list(range(10))
+	assert store.export()['close'].tolist() == list(range(1, 10)) + [-1]
+
+def test_allocate_and_length_mismatch():
+	store = make_store(False)
+	assert np.isnan(store.allocate('size', np.float64, np.nan)).all() and np.isnan(store.view('size')).all()
+
+	with pytest.raises(Exception):
+		store.add('close', np.arange(5))
+
+def test_schema():
+	schema = FeatureSchema()
+	schema.add({'name': 'open', 'type_np': np.float64})
+	schema.add({'name': 'cpl', 'type_np': np.bool_})
+
+	assert len(schema) == 2 and 'cpl' in schema and 'x' not in schema and schema.version == 2
+	assert schema.names == ['open', 'cpl'] and schema.get('x') is None
+	assert schema.dtype('cpl') == np.dtype(np.bool_) and schema.dtype('x') is None
+
+	with pytest.raises(Exception):
+		schema.add({'name': 'open', 'type_np': np.float32})
+
+	assert len(schema) == 2 and schema.version == 2
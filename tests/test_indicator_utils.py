@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+import talib
+
+from indicators.indicator_utils import find_runs, run_counts, count_consecutive, RunningEMA, RunningSMA, RunningRSI
+
+from conftest import make_minute, update_rows
+
+def run_counts_loop(x) -> np.ndarray:
+	# num_col as calculated before by IndicatorBasic
+	run_lengths = find_runs(x)[2]
+	return np.array([i+1 for r in run_lengths for i in range(r)], dtype=np.int_)
+
+@pytest.mark.parametrize('values', [[], [1], [1, 1, 1], [1, -1, 0, 0, 1, 1, 1, -1]])
+def test_run_counts_small(values):
+	assert run_counts(np.array(values)).tolist() == run_counts_loop(np.array(values)).tolist()
+
+def test_run_counts_random():
+	rng = np.random.default_rng(1)
+	col = rng.choice([-1, 0, 1], size=10000, p=[0.45, 0.1, 0.45]).astype(np.int8)
+
+	assert (run_counts(col) == run_counts_loop(col)).all()
+
+def test_count_consecutive():
+	cond = np.array([False, True, True, False, True, True, True, False, False, True])
+	expected = [0, 1, 2, 0, 1, 2, 3, 0, 0, 1]
+
+	assert count_consecutive(cond).tolist() == expected
+	assert count_consecutive(np.zeros(0, dtype=bool)).tolist() == []
+
+def stream(running, prices: np.ndarray, length: int, seed_values: np.ndarray, steps: list) -> list:
+
+	"""Feed prices into running state over a buffer of fixed length, as LiveData does. Each candle comes in as an
+	in-progress value first. steps gives the number of candles that are rolled in at once."""
+
+	buffer = prices[:length].copy()
+	running.seed(seed_values)
+	results, i = [], length
+
+	for n in steps:
+		buffer = np.concatenate((buffer[n:], prices[i:i+n]))
+		running.roll(n)
+
+		buffer[-1] = prices[i+n-1] + 0.5
+		running.update(buffer)
+		buffer[-1] = prices[i+n-1]
+		results.append(running.update(buffer))
+		i += n
+
+	return results
+
+@pytest.mark.parametrize('period', [9, 50, 200])
+def test_running_ema_sma_same_as_talib(period):
+	rng = np.random.default_rng(period)
+	prices = 100 + np.cumsum(rng.normal(size=3000))
+	steps = rng.choice([1, 1, 1, 2, 5], size=400).tolist()
+	ends = 1000 + np.cumsum(steps) - 1
+
+	ema = talib.EMA(prices, period)
+	assert np.allclose(stream(RunningEMA(period), prices, 1000, ema[:1000], steps), ema[ends], rtol=1e-10)
+
+	sma = talib.SMA(prices, period)
+	assert np.allclose(stream(RunningSMA(period), prices, 1000, prices[:1000], steps), sma[ends], rtol=1e-10)
+
+def test_running_ema_rolled_out_of_buffer():
+	# more candles are pending than the buffer holds, the state needs to be seeded again
+	ema = RunningEMA(9)
+	ema.seed(talib.EMA(np.arange(20, dtype=np.float64), 9))
+	ema.roll(2)
+
+	assert np.isnan(ema.update(np.array([1.0, 2.0])))
+	assert np.isnan(ema.update(np.array([1.0])))
+
+def test_running_ema_rewind():
+	prices = 100 + np.cumsum(np.random.default_rng(1).normal(size=300))
+	ema = talib.EMA(prices, 20)
+
+	running = RunningEMA(20)
+	stream(running, prices, 200, ema[:200], [1] * 100)
+
+	# the buffer holds prices 100 to 299, the state of an earlier candle comes from the float64 committed states,
+	# not from the values stored with less precision
+	running.rewind(ema[100:250].astype(np.float32))
+	assert np.isclose(running.committed, ema[248], rtol=1e-12) and running.committed != float(np.float32(ema[248]))
+	assert np.isclose(running.update(prices[100:250]), ema[249], rtol=1e-12)
+
+	# without committed states to go back to, the state is seeded from the stored values
+	running.rewind(ema[100:101])
+	assert np.isnan(running.committed)
+
+def test_indicator_mas_updates_same_as_talib(minute_df):
+	ld = make_minute(minute_df[:-300])
+	update_rows(ld, minute_df[-300:])
+
+	close = minute_df['close'].to_numpy(dtype=np.float64)
+	for p in [9, 20, 50, 100, 200]:
+		assert np.allclose(ld['m1'].get_feature('e' + str(p))[-300:], talib.EMA(close, p)[-300:], rtol=1e-10), p
+	for p in [9, 20, 30, 50, 100, 200]:
+		assert np.allclose(ld['m1'].get_feature('s' + str(p))[-300:], talib.SMA(close, p)[-300:], rtol=1e-10), p
+
+@pytest.mark.parametrize('period', [2, 14, 50])
+def test_running_rsi_same_as_talib(period):
+	rng = np.random.default_rng(period)
+	prices = 100 + np.cumsum(rng.normal(size=3000))
+	steps = rng.choice([1, 1, 1, 2, 5], size=400).tolist()
+	ends = 1000 + np.cumsum(steps) - 1
+
+	# seeded from the buffer, the state continues talib over all values
+	rsi = talib.RSI(prices, period)
+	assert np.allclose(stream(RunningRSI(period), prices, 1000, prices[:1000], steps), rsi[ends], rtol=1e-10)
+
+def test_running_rsi_rolled_out_of_buffer():
+	rsi = RunningRSI(3)
+	rsi.seed(np.arange(20, dtype=np.float64))
+	rsi.roll(2)
+
+	assert np.isnan(rsi.update(np.array([1.0, 2.0, 3.0])))
+	assert np.isnan(rsi.update(np.array([1.0])))
+
+def test_indicator_rsi_updates_same_as_talib(minute_df):
+	ld = make_minute(minute_df[:-300])
+	update_rows(ld, minute_df[-300:])
+
+	rsi = talib.RSI(minute_df['close'].to_numpy(dtype=np.float64), 14)
+	assert np.allclose(ld['m1'].get_feature('rsi')[-300:], rsi[-300:], rtol=1e-10)
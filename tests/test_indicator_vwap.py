@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from vbt_sim_live import LiveData, TFs
+from indicators.indicator_vwap import vwap_anchor_keys
+
+def make_vwap(df, params: dict, tf: str = 'm1') -> LiveData:
+	ld = LiveData.from_df(df, 'NVDA', TFs['m1'])
+	ld = ld if tf == 'm1' else ld.resample(TFs[tf])
+	ld.set_indicators({tf: {'IndicatorBasic': {}, 'IndicatorVWAP': params}})
+	ld.prepare_indicators()
+	return ld
+
+@pytest.mark.parametrize('params', [{}, {'anchor': 'open'}, {'rth_only': True}, {'anchor': 'open', 'rth_only': True}])
+def test_updates_same_as_prepare(minute_df, params):
+	updated = make_vwap(minute_df[:-1000], params)
+
+	# each candle comes in as in-progress candle first, some in batches as after a reconnect
+	for start in range(len(minute_df) - 1000, len(minute_df), 50):
+		rows = minute_df[start:start+50]
+		for i, (date, row) in enumerate(rows.iterrows()):
+			if i < 40:
+				partial = row.copy()
+				partial['close'] = partial['open']
+				partial['cpl'] = False
+				updated.update(partial)
+				updated.update_indicators()
+				updated.update(row)
+				updated.update_indicators()
+		updated.update_many(rows[40:])
+
+	prepared = make_vwap(minute_df, params)
+	for f in ['vwap', 'vwap2']:
+		assert np.allclose(updated.get_feature(f), prepared.get_feature(f)[-len(updated.get_feature(f)):], rtol=1e-12, equal_nan=True), f
+
+def test_anchor_and_rth_only(minute_df):
+	day, open_, rth = [make_vwap(minute_df, p).to_df() for p in [{}, {'anchor': 'open'}, {'rth_only': True}]]
+
+	# periods start with the first candle of the day, or with the first candle at the session open
+	typical = (day['high'] + day['low'] + day['close']) / 3
+	first_day, first_open = day.groupby('date_tz_d').head(1).index, day[~day['pre']].groupby('date_tz_d').head(1).index
+	assert np.allclose(day.loc[first_day, 'vwap'], typical[first_day]) and np.allclose(open_.loc[first_open, 'vwap'], typical[first_open])
+	assert not np.allclose(day.loc[first_open, 'vwap'], typical[first_open])
+
+	# candles in extended hours do not change the VWAP of the regular session
+	first_rth = rth[~rth['ext']].groupby('date_tz_d').head(1)
+	assert np.allclose(first_rth['vwap'], (first_rth['high'] + first_rth['low'] + first_rth['close']) / 3)
+
+@pytest.mark.parametrize('anchor', ['day', 'open'])
+def test_rth_only_nan_before_the_session(minute_df, anchor):
+	prepared = make_vwap(minute_df, {'anchor': anchor, 'rth_only': True})
+	df = prepared.to_df()
+
+	# premarket candles have no included volume yet, unless anchor 'open' adds them to the session of the previous day,
+	# candles after the close keep the VWAP of the session
+	periods = vwap_anchor_keys(df['date_tz_d'].values, df['pre'].values, anchor)
+	no_volume = df.groupby(periods)['ext'].transform(lambda ext: (~ext).cumsum() == 0)
+	assert no_volume.any() and df.loc[no_volume, 'pre'].all()
+	assert df.loc[no_volume, ['vwap', 'vwap2']].isna().all().all() and df.loc[~no_volume, ['vwap', 'vwap2']].notna().all().all()
+
+	updated = make_vwap(minute_df[:-600], {'anchor': anchor, 'rth_only': True})
+	for date, row in minute_df[-600:].iterrows():
+		updated.update(row)
+		updated.update_indicators()
+	for f in ['vwap', 'vwap2']:
+		assert np.allclose(updated.get_feature(f), prepared.get_feature(f)[-len(updated.get_feature(f)):], rtol=1e-12, equal_nan=True), f
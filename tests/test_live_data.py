@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vbt_sim_live import DtypePolicy, LiveData, TFs, ohlc_record_dtype
+
+from conftest import make_minute, update_rows, assert_same_data, indicator_info, strategy_info, realign_info
+
+def test_ring_buffer_same_as_plain(minute_df):
+	# more updates than the slack holds, so the ring buffer moves its window back several times
+	df_pre, df_update = minute_df[:800], minute_df[800:2800]
+
+	plain = make_minute(df_pre)
+	update_rows(plain, df_update)
+
+	ring = make_minute(df_pre, ring_buffer=True)
+	update_rows(ring, df_update)
+
+	assert ring['m1'].store.ring_buffer and not plain['m1'].store.ring_buffer
+	assert_same_data(plain, ring)
+
+def test_update_record_same_as_update(minute_df):
+	df_pre, df_update = minute_df[:-300], minute_df[-300:]
+
+	rows = make_minute(df_pre)
+	update_rows(rows, df_update)
+
+	records = np.empty(len(df_update), dtype=ohlc_record_dtype)
+	records['date'] = df_update.index.values
+	for f in ohlc_record_dtype.names[1:]:
+		records[f] = df_update[f].to_numpy()
+
+	# the record is re-used for every update, as by a feed handler
+	recorded, buffer = make_minute(df_pre), np.empty(1, dtype=ohlc_record_dtype)
+	for r in records:
+		buffer[0] = r
+		recorded['m1'].update_record(buffer[0])
+		recorded['m1'].cascade()
+
+	assert_same_data(rows, recorded, rtol=0)
+	assert recorded['m1'].update_record(records[0]) == (False, False)
+
+def test_buffer_sizing_same_as_full_history(minute_df):
+	df_pre, df_update = minute_df[:-200], minute_df[-200:]
+
+	full = make_minute(df_pre)
+	update_rows(full, df_update)
+
+	sized = make_minute(df_pre, indicator_info=indicator_info, strategy_info=strategy_info, headroom=100)
+	update_rows(sized, df_update)
+
+	# a day of m1 candles for VWAP, EMA200 convergence for m5, m30 has less history than that
+	assert [sized[tf].store.length for tf in ['m1', 'm5', 'm30']] == [1540, 1100, full['m30'].store.length]
+	assert sized['m1'].store.length < full['m1'].store.length
+
+	for tf in sized:
+		a, b = full[tf].to_df().iloc[-100:], sized[tf].to_df().iloc[-100:]
+		assert (a.index == b.index).all(), tf
+		for c in ['e9', 'e200', 's200', 'rsi', 'vwap']:
+			assert np.allclose(a[c], b[c], rtol=0, atol=1e-4, equal_nan=True), (tf, c)
+
+@pytest.mark.parametrize('unit', ['us', 'ns'])
+def test_from_df_trims_history(minute_df, unit):
+	df = minute_df.copy()
+	df.index = df.index.as_unit(unit)
+	info = {tf: indicator_info[tf] for tf in ['m1', 'm5']}
+
+	# the source keeps the rows of the latest 1100 m5 candles that m5 needs for EMA200 convergence, right from the start
+	ld = LiveData.from_df(df, 'NVDA', TFs['m1'], indicator_info=info, headroom=100)
+	m5_starts = df.index.floor('5min').unique()
+
+	assert len(ld.data['date']) == (df.index >= m5_starts[-1100]).sum() < len(df)
+	assert ld.data['date'].dtype == np.dtype('datetime64[ns]') and ld.data['date'][-1] == df.index.values[-1]
+
+@pytest.mark.parametrize('ring_buffer', [False, True])
+def test_update_many_same_as_single_updates(minute_df, ring_buffer):
+	df_pre, df_update = minute_df[:-400], minute_df[-400:]
+
+	single = make_minute(df_pre, ring_buffer=ring_buffer)
+	update_rows(single, df_update)
+
+	many = make_minute(df_pre, ring_buffer=ring_buffer)
+	# chunks that start with an update of the current candle as well as with a new one
+	for start in range(0, len(df_update), 37):
+		many['m1'].update_many(df_update[max(start-1, 0):start+37])
+
+	assert_same_data(single, many)
+	assert (single['m1'].get_feature('stratrsi_size') != 0).any()
+
+def test_update_many_longer_than_buffer(minute_df):
+	# the buffer holds the rows of df_pre only
+	df_pre, df_update = minute_df[:1500], minute_df[1500:5000]
+
+	single = make_minute(df_pre)
+	update_rows(single, df_update)
+
+	many = make_minute(df_pre)
+	count, rolls = many['m1'].update_many(df_update)
+
+	assert count == many['m1'].store.length and rolls == len(df_update)
+	assert_same_data(single, many)
+
+def test_update_many_outdated_rows(minute_df):
+	ld = make_minute(minute_df[:-5])
+	assert ld['m1'].update_many(minute_df[-10:-6]) == (0, 0)
+	assert ld['m1'].update_many(minute_df[-10:-6].iloc[:0]) == (0, 0)
+
+def test_revise_same_as_corrected_updates(minute_df):
+	df_pre, df_update = minute_df[:-400], minute_df[-400:]
+	corrected = df_update.iloc[120].copy()
+	wrong = corrected.copy()
+	wrong['high'] += 1.5
+	wrong['close'] += 1.0
+
+	single = make_minute(df_pre)
+	update_rows(single, df_update)
+
+	revised = make_minute(df_pre)
+	update_rows(revised, df_update.iloc[:120])
+	update_rows(revised, wrong.to_frame().T)
+	update_rows(revised, df_update.iloc[121:])
+
+	assert revised['m1'].revise(corrected)
+	# RSI state is rebuilt from the buffer, which is shorter than the history of the single updates for m30
+	assert_same_data(single, revised, rtol=1e-6)
+
+def test_revise_latest_row(minute_df):
+	single = make_minute(minute_df[:-1])
+	update_rows(single, minute_df[-1:])
+
+	revised = make_minute(minute_df[:-1])
+	wrong = minute_df.iloc[-1].copy()
+	wrong['low'] -= 2.0
+	update_rows(revised, wrong.to_frame().T)
+
+	assert revised['m1'].revise(minute_df.iloc[-1])
+	assert not revised['m1'].revise(minute_df.iloc[-1].rename(minute_df.index[-1] + pd.Timedelta('30s')))
+	assert_same_data(single, revised)
+
+def test_compact_dtype_policy_same_as_default(minute_df):
+	df_pre, df_update = minute_df[:-100], minute_df[-100:]
+
+	default = make_minute(df_pre)
+	update_rows(default, df_update)
+
+	compact = make_minute(df_pre, dtype_policy=DtypePolicy.compact())
+	update_rows(compact, df_update)
+
+	for tf in compact:
+		a, b = default[tf].to_df(), compact[tf].to_df()
+		assert (b['close'].dtype, b['volume'].dtype, b['col'].dtype, b['date_hm'].dtype) == (np.float32, np.float64, np.int8, np.int16), tf
+
+		assert (a.index == b.index).all(), tf
+		for c in ['open', 'close', 'volume', 'e20', 's200', 'vwap']:
+			assert np.allclose(a[c], b[c], rtol=1e-6, equal_nan=True), (tf, c)
+		# RSI is calculated from the rounded price changes
+		assert np.allclose(a['rsi'], b['rsi'], rtol=0, atol=1e-2, equal_nan=True), tf
+		assert (a['col'] == b['col']).all(), tf
+
+	assert compact['m1'].to_df()['stratrsi_size'].dtype == np.int32
+
+def test_cascade_same_as_manual_steps(minute_df):
+	df_pre, df_update = minute_df[:-300], minute_df[-300:]
+
+	cascaded = make_minute(df_pre)
+	update_rows(cascaded, df_update)
+
+	# the steps of the minute example before cascade(), without dependents
+	manual = make_minute(df_pre)
+	manual['m1'].dependents = []
+	for i, row in df_update.iterrows():
+		manual['m1'].update(row)
+		updates = manual['m1'].resample_many([TFs['m5'], TFs['m30']], update=True)
+		for tf in ['m5', 'm30']:
+			manual[tf].update(updates[tf])
+		for tf in ['m1', 'm5', 'm30']:
+			manual[tf].update_indicators()
+		for tf in ['m5', 'm30']:
+			manual['m1'].realign(manual[tf], realign_info, update=True)
+		manual['m1'].update_strategies()
+
+	assert_same_data(manual, cascaded, rtol=0)
+
+def test_daily_candles_from_minute_stream(minute_df):
+	# d1, w1 and M1 are driven by the 1m stream of the last days, and get the same candles as resampled from all 1m data
+	split = np.searchsorted(minute_df.index.values, minute_df.index.values[-1] - np.timedelta64(3, 'D'))
+	full = LiveData.from_df(minute_df, 'NVDA', TFs['m1'])
+
+	ld = {'m1': LiveData.from_df(minute_df[:split], 'NVDA', TFs['m1'])}
+	ld['d1'] = ld['m1'].resample(TFs['d1'])
+	ld['w1'] = ld['d1'].resample(TFs['w1'])
+	ld['M1'] = ld['d1'].resample(TFs['M1'])
+	ld['m1'].add_dependent(ld['d1'])
+	ld['d1'].add_dependent(ld['w1'])
+	ld['d1'].add_dependent(ld['M1'])
+
+	ld['d1'].set_indicators({'d1': {'IndicatorBasic': {}}})
+	ld['d1'].prepare_indicators()
+
+	update_rows(ld, minute_df[split:])
+
+	d1 = full.resample(TFs['d1'])
+	expected = {'d1': d1, 'w1': d1.resample(TFs['w1']), 'M1': d1.resample(TFs['M1'])}
+
+	# the buffers keep the length they were created with
+	for tf in ['d1', 'w1', 'M1']:
+		a, b = ld[tf].to_df(), expected[tf].to_df()
+		b = b.iloc[-len(a):]
+		assert len(a) == len(b) and (a.index == b.index).all(), tf
+		for c in ['date_l', 'open', 'high', 'low', 'close', 'volume', 'cpl']:
+			assert (a[c] == b[c]).all(), (tf, c)
+
+	# indicators of the dependents follow their updates
+	d1 = ld['d1'].to_df()
+	assert (d1['body'] == abs(d1['close'] - d1['open'])).all()
+
+def test_update_many_and_revise_keep_dtype_policy(minute_df):
+	df_pre, df_update = minute_df[:-400], minute_df[-400:]
+	single = make_minute(df_pre, dtype_policy=DtypePolicy.compact())
+	update_rows(single, df_update)
+
+	ld = make_minute(df_pre, dtype_policy=DtypePolicy.compact())
+	dtypes = {tf: ld[tf].to_df().dtypes for tf in ld}
+	assert dtypes['m1']['close'] == np.float32 and dtypes['m1']['col'] == np.int8 and dtypes['m1']['stratrsi_size'] == np.int32
+
+	ld['m1'].update_many(df_update)
+	corrected = df_update.iloc[-50].copy()
+	corrected['close'] += 0.5
+	assert ld['m1'].revise(corrected)
+	assert ld['m1'].revise(df_update.iloc[-50])
+
+	# the replayed rows are written into the stored arrays, with the dtypes of the policy
+	for tf in ld:
+		assert (ld[tf].to_df().dtypes == dtypes[tf]).all(), tf
+		for ind in ld[tf].indicators + ld[tf].strategies:
+			assert all(ind.__dict__[n] is ld[tf].data[n] for n in ind.output_names), tf
+
+	assert_same_data(single, ld, rtol=1e-5)
+
+def test_revise_keeps_float64_ema_state(minute_df):
+	df_pre, df_update = minute_df[:-400], minute_df[-400:]
+	corrected = df_update.iloc[-50].copy()
+	wrong = corrected.copy()
+	wrong['close'] += 0.5
+
+	single = make_minute(df_pre, dtype_policy=DtypePolicy.compact())
+	update_rows(single, df_update)
+
+	revised = make_minute(df_pre, dtype_policy=DtypePolicy.compact())
+	update_rows(revised, df_update.iloc[:-50])
+	update_rows(revised, wrong.to_frame().T)
+	update_rows(revised, df_update.iloc[-49:])
+	assert revised['m1'].revise(corrected)
+
+	# the replayed EMAs continue from the float64 state, not from the float32 values they are stored with
+	for tf in single:
+		for n in ['e9', 'e20', 'e50', 'e100', 'e200']:
+			assert single[tf].data[n].dtype == np.float32
+			assert np.array_equal(single[tf].data[n], revised[tf].data[n], equal_nan=True), (tf, n)
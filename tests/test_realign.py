@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vbt_sim_live import LiveData, TFs
+
+from conftest import make_minute, update_rows, realign_info
+
+def merge_realigned(from_dates: np.ndarray, from_values: np.ndarray, to_dates: np.ndarray, tf_from: int, tf_to: int, align: str) -> np.ndarray:
+
+	"""Realigned values as calculated by merging on keys with pandas, before the index map (see LiveData.realign())."""
+
+	to_seconds = to_dates.astype('datetime64[s]').astype(np.int64)
+	df_to = pd.DataFrame({'key': to_seconds // tf_from if align == 'open' else (to_seconds - tf_from + tf_to) // tf_from})
+	df_from = pd.DataFrame({'key': from_dates.astype('datetime64[s]').astype(np.int64) // tf_from, 'values': from_values})
+	return pd.merge(df_to, df_from, how='left', on='key')['values'].to_numpy()
+
+@pytest.mark.parametrize('align', ['open', 'close'])
+def test_intraday_same_as_merge(minute_df, align):
+	ld = {'m1': LiveData.from_df(minute_df, 'NVDA', TFs['m1'])}
+	info = []
+	for tf in ['m5', 'm30', 'h1']:
+		ld[tf] = ld['m1'].resample(TFs[tf])
+		info += [{'align': align, 'feature': f, 'from': tf, 'to': 'm1'} for f in ['close', 'volume', 'cpl']]
+
+	for tf in ['m5', 'm30', 'h1']:
+		ld['m1'].realign(ld[tf], info)
+
+		for f in ['close', 'volume', 'cpl']:
+			expected = merge_realigned(ld[tf].data['date'], ld[tf].data[f], ld['m1'].data['date'], TFs[tf].value, 60, align)
+			realigned = ld['m1'].get_feature(f + tf)
+			missing = pd.isna(expected)
+			assert realigned.dtype == ld[tf].data[f].dtype, (tf, f)
+			assert (realigned[~missing] == expected[~missing]).all(), (tf, f)
+			# rows without a source candle are NaN, or 0 for other dtypes
+			assert (pd.isna(realigned[missing]) if realigned.dtype.kind == 'f' else realigned[missing] == 0).all(), (tf, f)
+
+def test_d1_same_as_previous_session_day(minute_df):
+	m1 = LiveData.from_df(minute_df, 'NVDA', TFs['m1'])
+	d1 = m1.resample(TFs['d1'])
+	m1.realign(d1, [{'align': 'close', 'feature': 'high', 'from': 'd1', 'to': 'm1'}, {'align': 'open', 'feature': 'low', 'from': 'd1', 'to': 'm1'}])
+
+	local = pd.DatetimeIndex(m1.data['date']).tz_localize('UTC').tz_convert(m1.tz)
+	d1_days = pd.DatetimeIndex(d1.data['date']).tz_localize('UTC').tz_convert(m1.tz).normalize()
+	days = local.normalize()
+
+	# the high of the previous session day until the candle that ends at the session close, then the one of the same day
+	complete = (local + pd.Timedelta('1min')).time >= pd.Timestamp('16:00').time()
+	close_idx = np.searchsorted(d1_days, days, side='right') - 1 - ~complete
+	open_idx = np.searchsorted(d1_days, days)
+
+	expected_high = np.where(close_idx >= 0, d1.data['high'][np.maximum(close_idx, 0)], np.nan)
+	assert np.array_equal(m1.get_feature('highd1'), expected_high, equal_nan=True)
+	assert (m1.get_feature('lowd1') == d1.data['low'][open_idx]).all()
+
+	# candles before the first session day of the data have no prior day high
+	assert np.isnan(m1.get_feature('highd1')[0]) and not np.isnan(m1.get_feature('highd1')[-1])
+
+def test_updates_same_as_realign_at_open(minute_df):
+	# updates copy the latest, in-progress value of the source candle, as realigned at open
+	ld = make_minute(minute_df[:-200])
+	update_rows(ld, minute_df[-200:])
+
+	for tf in ['m5', 'm30']:
+		expected = merge_realigned(ld[tf].data['date'], ld[tf].data['s20'], ld['m1'].data['date'][-1:], TFs[tf].value, 60, 'open')
+		assert ld['m1'].get_feature('s20' + tf)[-1] == expected[-1]
+
+@pytest.mark.parametrize('ring_buffer', [False, True])
+def test_plan_same_as_feature_lookups(minute_df, ring_buffer):
+	ld = make_minute(minute_df[:-300], ring_buffer=ring_buffer)
+
+	for i in range(300):
+		update_rows(ld, minute_df[-300+i:-299+i or None])
+
+		# the loop over realign_info before the plan
+		for r in realign_info:
+			assert ld['m1'].get_feature(r['feature'] + r['from'])[-1] == ld[r['from']].get_feature(r['feature'])[-1] or np.isnan(ld[r['from']].get_feature(r['feature'])[-1])
+
+	# the plan holds the positions of the features in both stores
+	plan = ld['m1'].get_realign_plan(ld['m5'], realign_info)
+	assert plan == [(ld['m5'].store.columns[r['feature']], ld['m1'].store.columns[r['feature'] + 'm5']) for r in realign_info if r['from'] == 'm5']
+
+	# it is kept across rolls, moved views and windows
+	ld['m1'].update(minute_df.iloc[-1].rename(minute_df.index[-1] + pd.Timedelta('1min')))
+	ld['m1'].set_window(ld['m1'].store.length - 5)
+	assert ld['m1'].get_realign_plan(ld['m5'], realign_info) is plan
+	ld['m1'].release_window()
+
+	# and rebuilt once features are added or other realign info is given
+
+	plan = ld['m1'].get_realign_plan(ld['m5'], realign_info)
+	info = realign_info + [{'align': 'close', 'feature': 'e9', 'from': 'm5', 'to': 'm1'}]
+	ld['m1'].realign(ld['m5'], info[-1:])
+	assert ld['m1'].get_realign_plan(ld['m5'], realign_info) is not plan
+	assert len(ld['m1'].get_realign_plan(ld['m5'], info)) == len(plan) + 1
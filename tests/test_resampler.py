@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vbt_sim_live import LiveData, TFs
+from vbt_sim_live.resampler import IncrementalResampler, resample_ohlcv, resample_cpl, resample_mask
+
+ohlcv = ['date', 'date_l', 'open', 'high', 'low', 'close', 'volume', 'cpl']
+
+def as_arrays(df: pd.DataFrame) -> dict:
+	# date_l keeps the unit it is read with
+	data = {n: df[n].to_numpy() for n in ohlcv if n != 'date'}
+	data['date'] = df.index.values.astype('datetime64[ns]')
+	return data
+
+@pytest.mark.parametrize('tf', ['m5', 'm30', 'h1', 'd1'])
+def test_incremental_same_as_full_resample(minute_df, tf):
+	timeframe = TFs[tf]
+	data = as_arrays(minute_df[-3000:])
+	resampler = IncrementalResampler(timeframe)
+
+	# every row comes in twice, first as in-progress candle, then complete, as from a live feed
+	partial = {n: v.copy() for n, v in data.items()}
+	partial['cpl'][:] = False
+
+	# rows are added one by one, with a gap of a few rows that makes the resampler rebuild its state
+	for i in list(range(0, 1200)) + list(range(1205, 1500)):
+		for src in [partial, data]:
+			window = {n: np.concatenate((data[n][max(i-500, 0):i], src[n][i:i+1])) for n in ohlcv}
+			row = resampler.update(window)
+			keys, full = resample_ohlcv(window, timeframe)
+
+			if row is None:
+				# rows outside of the session are not part of d1 candles
+				assert tf == 'd1' and not resample_mask(window['date'][-1:], timeframe)[0]
+				continue
+
+			assert row['date'] == full['date'][-1], i
+			for n in ['date_l', 'open', 'high', 'low', 'close', 'volume']:
+				assert row[n] == full[n][-1], (i, n)
+			assert row['cpl'] == resample_cpl(keys[-1:], full['date_l'][-1:], full['cpl'][-1:], timeframe)[0], i
+
+def test_resample_many_same_as_resample(minute_df):
+	ld = LiveData.from_df(minute_df[-5000:], 'NVDA', TFs['m1'])
+	timeframes = [TFs['h1'], TFs['m5'], TFs['m30'], TFs['m15'], TFs.from_name('m65'), TFs['d1'], TFs['w1']]
+
+	# intraday timeframes are grouped from lower ones, e.g. m30 from m15 from m5
+	many = ld.resample_many(timeframes)
+	assert list(many.keys()) == sorted([tf.name for tf in timeframes], key=lambda n: TFs.from_name(n).value)
+
+	for tf in timeframes:
+		single = ld.resample(tf).to_df()
+		assert single.equals(many[tf.name].to_df()), tf.name
+
+	# updates pass the latest row to every incremental resampler
+	other = LiveData.from_df(minute_df[-5000:], 'NVDA', TFs['m1'])
+	for i, row in minute_df[-300:].iterrows():
+		ld.update(row)
+		other.update(row)
+		rows = ld.resample_many(timeframes, update=True)
+		for tf in timeframes:
+			assert rows[tf.name] == other.resample(tf, update=True), (i, tf.name)
+
+@pytest.mark.parametrize('tf, rule', [('m3', '3min'), ('m5', '5min'), ('m30', '30min'), ('h4', '4h'), ('m65', '65min'), ('h2', '2h'), ('s30', '30s'),
+	('w1', 'W-MON'), ('M1', 'MS')])
+def test_resample_ohlcv_same_as_pandas(minute_df, tf, rule):
+	df = minute_df
+	keys, resampled = resample_ohlcv(as_arrays(df), TFs.from_name(tf))
+
+	kwargs = {'w1': {'label': 'left', 'closed': 'left'}, 'M1': {}}.get(tf, {'origin': 'epoch'})
+	expected = df.resample(rule, **kwargs).agg({'date_l': 'last', 'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum', 'cpl': 'last'})
+	expected = expected[df['open'].resample(rule, **kwargs).count() > 0]
+
+	assert len(keys) == len(expected) and (np.diff(keys) > 0).all()
+	assert (resampled['date'] == expected.index.values).all()
+	for n in ['date_l', 'open', 'high', 'low', 'close', 'volume', 'cpl']:
+		assert (resampled[n] == expected[n].to_numpy()).all(), n
+
+def test_timeframe_from_name():
+	assert TFs.from_name('m5') is TFs['m5'] and TFs['m3'].value == 180
+	assert TFs.from_name('m65').value == 65*60 and TFs.from_name('h2').value == 2*60*60 and TFs.from_name('s30').is_intraday()
+	assert TFs.from_name('m60') == TFs.from_name('m60') and TFs.from_name('m60') != TFs['h1']
+	assert TFs.from_name('h2') in {TFs.from_name('h2'): 1}
+
+	for name in ['d2', 'h24', 'm0', 'mx', 'x5']:
+		with pytest.raises(Exception):
+			TFs.from_name(name)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vbt_sim_live import LiveData, TFs
+from vbt_sim_live.row_view import records_to_datetime
+
+from conftest import make_minute, update_rows
+
+@pytest.mark.parametrize('ring_buffer', [False, True])
+def test_row_view_same_as_get_row_range(minute_df, ring_buffer):
+	ld = make_minute(minute_df[:-100], ring_buffer=ring_buffer)
+	view, ohlc = ld['m1'].row_view(), ld['m1'].row_view(['close', 'rsi'])
+	assert ld['m1'].row_view() is view
+
+	# the views are created once and follow the updates, also when the ring buffer moves its views
+	for i in range(100):
+		update_rows(ld, minute_df.iloc[-100+i:-99+i or None])
+		latest = ld['m1'].get_row_range(range(-1, 0), date_as_datetime=True, as_dict=True)[0]
+
+		assert view.to_dict().keys() == latest.keys()
+		assert all(view[n] == latest[n] or pd.isna(latest[n]) for n in latest if n not in ['date', 'date_l'])
+		assert view.datetime(tz_convert=False).replace(tzinfo=None) == latest['date']
+		assert ohlc.close == latest['close'] and ohlc.keys() == ['close', 'rsi']
+
+	with pytest.raises(KeyError):
+		ohlc['open']
+	with pytest.raises(AttributeError):
+		view.close = 1.0
+
+def test_get_rows_same_as_to_df(minute_df):
+	ld = make_minute(minute_df[-2000:])['m1']
+	df = ld.to_df(set_index=False)
+
+	records = ld.get_rows(range(-50, 0), ['date', 'close', 'cpl'])
+	assert records.dtype.names == ('date', 'close', 'cpl')
+	assert (records['date'] == df['date'].values[-50:]).all() and (records['close'] == df['close'].values[-50:]).all()
+	assert (ld.get_rows(slice(100, 120))['rsi'] == df['rsi'].values[100:120]).all()
+
+	dts = records_to_datetime(records['date'], ld.tz)
+	assert dts == df['date'].dt.tz_localize('UTC').dt.tz_convert(ld.tz).iloc[-50:].dt.to_pydatetime().tolist()
+
+def test_at_time_and_between_same_as_pandas(minute_df):
+	ld = make_minute(minute_df[-3000:])
+	rng = np.random.default_rng(4)
+
+	for tf in ['m1', 'm5']:
+		df = ld[tf].to_df()
+		step = pd.Timedelta(seconds=ld[tf].timeframe.value)
+		# random times within the data, including gaps overnight, and a time before the first candle
+		times = df.index[0] - pd.Timedelta('1min') + pd.to_timedelta(rng.integers(0, (df.index[-1] - df.index[0]).total_seconds() + 600, size=200), unit='s')
+
+		for ts in times:
+			covering = df.index[df.index <= ts]
+			expected = covering[-1] if len(covering) and ts < covering[-1] + step else None
+			# tz-aware timestamps address the same candles
+			for t in [ts, ts.tz_localize('UTC').tz_convert(ld[tf].tz)]:
+				row = ld[tf].at_time(t, ['date', 'close'])
+				assert (row is None and expected is None) or (row.date == expected and row.close == df.loc[expected, 'close']), (tf, ts)
+
+		for start, end in zip(times[::2], times[1::2]):
+			start, end = min(start, end), max(start, end)
+			expected = df.loc[start:end]
+			window = ld[tf].between(start.tz_localize('UTC').tz_convert(ld[tf].tz), end, ['date', 'rsi'])
+			assert (window['date'] == expected.index.values).all() and np.array_equal(window['rsi'], expected['rsi'].values, equal_nan=True)
+
+	# zero-copy slices of the feature arrays
+	assert np.shares_memory(ld['m1'].between(features=['close'])['close'], ld['m1'].data['close'])
+
+def make_candles(dates: list, timeframe: str) -> LiveData:
+	index = pd.DatetimeIndex(dates)
+	df = pd.DataFrame({'date_l': index, 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': np.arange(len(index), dtype=np.float64),
+		'volume': 100, 'cpl': True}, index=index)
+	return LiveData.from_df(df, 'NVDA', TFs[timeframe])
+
+def test_at_time_follows_the_calendar():
+	# March is missing, so no candle covers it, though February plus 31 days would
+	m1 = make_candles(['2024-01-01', '2024-02-01', '2024-04-01'], 'M1')
+	assert m1.at_time(np.datetime64('2024-02-29T12:00'), ['close']).close == 1
+	assert m1.at_time(np.datetime64('2024-03-02T12:00')) is None
+	assert m1.at_time(np.datetime64('2024-04-30T23:00'), ['close']).close == 2
+
+	# d1 candles are dated at local midnight, the day of the end of daylight saving time has 25 hours
+	d1 = make_candles(['2024-11-01T04:00', '2024-11-03T04:00', '2024-11-04T05:00'], 'd1')
+	assert d1.at_time(pd.Timestamp('2024-11-03 23:30', tz='America/New_York'), ['close']).close == 1
+	assert d1.at_time(pd.Timestamp('2024-11-02 12:00', tz='America/New_York')) is None
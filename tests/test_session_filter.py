@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vbt_sim_live import LiveData, TFs, SessionFilter
+
+from conftest import assert_same_data
+
+@pytest.mark.parametrize('session, window', [('rth', ('09:30', '16:00')), ('eth', ('04:00', '20:00')), (('10:00', '12:30'), ('10:00', '12:30'))])
+def test_mask_same_as_between_time(minute_df, session, window):
+	sf = SessionFilter(session)
+	local = minute_df.index.tz_localize('UTC').tz_convert('America/New_York')
+	expected = local.indexer_between_time(window[0], window[1], include_end=False)
+
+	mask = sf.mask(minute_df.index.values)
+	assert mask.any()
+	assert np.array_equal(np.flatnonzero(mask), expected)
+	assert [sf.contains(d) for d in minute_df.index.values] == mask.tolist()
+
+def test_filtered_updates_same_as_prefiltered_data(minute_df):
+	mask = SessionFilter('rth').mask(minute_df.index.values)
+	df_pre, df_update = minute_df[:-1500], minute_df[-1500:]
+
+	filtered = {'m1': LiveData.from_df(df_pre, 'NVDA', TFs['m1'], session='rth')}
+	prefiltered = {'m1': LiveData.from_df(df_pre[mask[:-1500]], 'NVDA', TFs['m1'])}
+
+	for ld in [filtered, prefiltered]:
+		ld['m5'] = ld['m1'].resample(TFs['m5'])
+		ld['m1'].add_dependent(ld['m5'])
+
+	# rows outside of the session are disregarded by updates
+	for i, row in df_update.iterrows():
+		assert filtered['m1'].update(row)[0] == SessionFilter('rth').contains(i.to_datetime64())
+		filtered['m1'].cascade()
+
+	prefiltered['m1'].update_many(df_update[mask[-1500:]])
+	assert_same_data(prefiltered, filtered, rtol=0)
+
+def test_invalid_session():
+	for session in ['xyz', ('16:00', '09:30')]:
+		with pytest.raises(Exception):
+			SessionFilter(session)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+import vectorbtpro as vbt
+
+from vbt_sim_live import GenericData, SimData, LiveData, TFs
+from conftest import examples
+
+if not hasattr(vbt.Data, 'from_data'):
+	pytest.skip("vectorbtpro Data is required for SimData", allow_module_level=True)
+
+@pytest.fixture(scope='module')
+def daily_df() -> pd.DataFrame:
+	return GenericData.df_ensure_format(pd.read_csv(examples.joinpath('OHLC_Test_Daily_Data.csv')))
+
+def assert_same_candles(sim: SimData, live: LiveData) -> None:
+	df_sim, df_live = sim.to_df(), live.to_df()
+
+	assert (df_sim.index.values == df_live.index.values).all()
+	for c in ['date_l', 'open', 'high', 'low', 'close', 'volume']:
+		assert (df_sim[c].to_numpy() == df_live[c].to_numpy()).all(), c
+
+@pytest.mark.parametrize('timeframe', ['m5', 'm30', 'd1'])
+def test_resample_intraday_same_as_live(minute_df, timeframe):
+	sim = SimData.from_df(minute_df, 'NVDA', TFs['m1']).resample(TFs[timeframe])
+	live = LiveData.from_df(minute_df, 'NVDA', TFs['m1']).resample(TFs[timeframe])
+
+	assert_same_candles(sim, live)
+
+def test_resample_d1_from_session(minute_df):
+	sim = SimData.from_df(minute_df, 'NVDA', TFs['m1']).resample(TFs['d1'])
+	df = sim.to_df()
+
+	# one candle per local session day, opened at 09:30 and closed with the last candle before 16:00
+	local = minute_df.index.tz_localize('UTC').tz_convert('America/New_York')
+	rth = minute_df[(local.hour*60 + local.minute >= 570) & (local.hour < 16)]
+	days = rth.index.tz_localize('UTC').tz_convert('America/New_York').normalize()
+	ref = rth.groupby(days).agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+
+	assert (df.index.values == ref.index.tz_convert('UTC').tz_localize(None).values).all()
+	assert np.allclose(df[['open', 'high', 'low', 'close', 'volume']].to_numpy(), ref.to_numpy())
+
+def test_resample_is_cached(minute_df):
+	sim = SimData.from_df(minute_df, 'NVDA', TFs['m1'])
+
+	# a new SimData object on the cached data on every call
+	m5 = sim.resample(TFs['m5'])
+	assert sim.resample(TFs['m5']) is not m5 and sim.resample(TFs['m5']).data is m5.data
+	assert sim.resample(TFs['m30']).data is not m5.data
+
+@pytest.mark.parametrize('timeframe', ['w1', 'M1'])
+def test_resample_weekly_monthly_same_as_live(daily_df, timeframe):
+	sim = SimData.from_df(daily_df, 'NVDA', TFs['d1']).resample(TFs[timeframe])
+	live = LiveData.from_df(daily_df, 'NVDA', TFs['d1']).resample(TFs[timeframe])
+
+	assert_same_candles(sim, live)
+	assert not np.isnan(sim.get_feature('open')).any()
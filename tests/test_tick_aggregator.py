@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+from vbt_sim_live import TickAggregator
+
+def make_trades(n: int = 3000, seed: int = 2) -> pd.DataFrame:
+	rng = np.random.default_rng(seed)
+	start = np.datetime64('2024-03-04T14:30:00', 'ns').astype(np.int64)
+	ts = start + np.cumsum(rng.integers(0, 2 * 10**9, size=n))
+	return pd.DataFrame({
+		'price': 100 + np.cumsum(rng.normal(0, 0.05, size=n)),
+		'size': rng.integers(1, 500, size=n).astype(np.float64),
+	}, index=pd.DatetimeIndex(ts.astype('datetime64[ns]')))
+
+def collect(updates: list) -> pd.DataFrame:
+	df = pd.concat([pd.DataFrame(u) for u in updates if u is not None])
+	return df.groupby('date').last()
+
+def test_same_as_pandas_resample():
+	trades = make_trades()
+	agg = TickAggregator()
+
+	rng = np.random.default_rng(3)
+	bounds = np.unique(np.concatenate(([0, len(trades)], rng.integers(0, len(trades), size=200))))
+	updates = [agg.add(trades['price'].values[s:e], trades['size'].values[s:e], trades.index.values[s:e]) for s, e in zip(bounds[:-1], bounds[1:])]
+	updates.append(agg.flush())
+	candles = collect(updates)
+
+	expected = trades.resample('1min').agg({'price': ['first', 'max', 'min', 'last'], 'size': 'sum'}).dropna()
+	expected.columns = ['open', 'high', 'low', 'close', 'volume']
+	date_l = trades.index.to_series().resample('1min').last().dropna()
+
+	assert (candles.index.values == expected.index.values).all()
+	for c in expected.columns:
+		assert np.allclose(candles[c].values, expected[c].values), c
+	assert (candles['date_l'].values == date_l.values).all()
+	assert candles['cpl'].all()
+
+def test_in_progress_candle_and_cadence():
+	trades = make_trades(600)
+	price, size, ts = trades['price'].values, trades['size'].values, trades.index.values
+	every, cadence = TickAggregator(), TickAggregator(cadence=30)
+
+	emitted_every, emitted_cadence = 0, 0
+	for i in range(len(trades)):
+		u_every, u_cadence = every.add(price[i:i+1], size[i:i+1], ts[i:i+1]), cadence.add(price[i:i+1], size[i:i+1], ts[i:i+1])
+		assert not u_every['cpl'][-1] and u_every['cpl'][:-1].all()
+		emitted_every += len(u_every['date'])
+		emitted_cadence += 0 if u_cadence is None else len(u_cadence['date'])
+
+		# completed candles are emitted regardless of the cadence
+		if len(u_every['date']) > 1:
+			assert u_cadence is not None and u_cadence['cpl'][0] and u_cadence['date'][0] == u_every['date'][0]
+
+	assert emitted_cadence < emitted_every
+	assert every.candle()['close'][0] == cadence.candle()['close'][0] == price[-1]
+
+def test_late_trades_are_dropped():
+	trades = make_trades(300)
+	price, size, ts = trades['price'].values, trades['size'].values, trades.index.values
+	agg = TickAggregator()
+	agg.add(price, size, ts)
+	volume = agg.volume
+
+	# trades of completed candles are dropped, trades of the in-progress candle are merged
+	assert agg.add(price[:5], size[:5], ts[:5]) is None
+	update = agg.add(price[-1:], size[-1:], ts[-1:])
+	assert len(update['date']) == 1 and update['volume'][0] == volume + size[-1]
+
+	assert agg.flush(ts[-1]) is None
+	assert agg.flush()['cpl'][0] and agg.flush() is None
+
+def test_empty_batch():
+	trades = make_trades(100)
+	agg = TickAggregator()
+
+	assert agg.add([], [], np.array([], dtype='datetime64[ns]')) is None
+	agg.add(trades['price'].values, trades['size'].values, trades.index.values)
+	candle = agg.candle()
+
+	# an empty batch leaves the in-progress candle as it is
+	assert agg.add(np.array([]), np.array([]), np.array([], dtype=np.int64)) is None
+	assert all((agg.candle()[k] == v).all() for k, v in candle.items())
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vbt_sim_live import LiveData, TFs, TradingCalendar, SessionFilter
+from vbt_sim_live.trading_calendar import get_default_calendar
+
+def test_default_calendar_per_timezone():
+	assert get_default_calendar().tz == 'America/New_York'
+	assert get_default_calendar('Europe/Berlin').tz == 'Europe/Berlin'
+	assert get_default_calendar('Europe/Berlin') is get_default_calendar('Europe/Berlin')
+
+def test_data_gets_calendar_of_its_timezone(minute_df):
+	ld = LiveData.from_df(minute_df[-3000:], 'NVDA', TFs['m1'], tz='Europe/Berlin', session='rth')
+	assert ld.calendar.tz == 'Europe/Berlin' and ld.session.calendar is ld.calendar
+
+	# day index and session are those of Berlin local time
+	local = pd.DatetimeIndex(ld.get_feature('date')).tz_localize('UTC').tz_convert('Europe/Berlin')
+	days = (local.tz_localize(None).normalize() - pd.Timestamp(0)).days.to_numpy()
+	seconds = local.hour.to_numpy() * 3600 + local.minute.to_numpy() * 60
+	assert (ld.calendar.day_index(ld.get_feature('date')) == days).all()
+	assert ((seconds >= 34200) & (seconds < 57600)).all()
+
+	d1 = ld.resample(TFs['d1'])
+	assert (pd.DatetimeIndex(d1.get_feature('date')).tz_localize('UTC').tz_convert('Europe/Berlin').hour == 0).all()
+
+def test_calendar_timezone_mismatch(minute_df):
+	with pytest.raises(Exception):
+		LiveData.from_df(minute_df[-100:], 'NVDA', TFs['m1'], tz='Europe/Berlin', calendar=TradingCalendar())
+
+	with pytest.raises(Exception):
+		LiveData.from_df(minute_df[-100:], 'NVDA', TFs['m1'], tz='Europe/Berlin', session=SessionFilter('rth'))
+
+def test_week_and_month_ends_with_holidays():
+	holidays = ['2024-03-29', '2024-05-31', '2024-12-25']
+	calendar = TradingCalendar(start='2024-01-01', end='2024-12-31', holidays=holidays, half_days=['2024-12-24'])
+
+	bdays = pd.bdate_range('2024-01-01', '2024-12-31')
+	bdays = bdays[~bdays.isin(pd.DatetimeIndex(holidays))]
+	week_ends = bdays.to_series().groupby(bdays.to_period('W')).max()
+	month_ends = bdays.to_series().groupby(bdays.to_period('M')).max()
+
+	def to_days(index):
+		return ((pd.DatetimeIndex(index) - pd.Timestamp(0)).days).to_numpy()
+
+	assert (calendar.session_days == to_days(bdays)).all()
+	assert (calendar.week_ends == to_days(week_ends)).all()
+	assert (calendar.month_ends == to_days(month_ends)).all()
+	assert calendar.is_half_day(to_days(['2024-12-24'])[0]) and not calendar.is_session_day(to_days(['2024-03-29'])[0])
+	assert calendar.session_close_time(to_days(['2024-12-24'])[0]) == 46800
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vbt_sim_live import TzOffsets
+
+zones = ['America/New_York', 'America/Chicago', 'Europe/Berlin', 'Europe/London', 'Asia/Tokyo', 'Australia/Sydney', 'UTC',
+	'Africa/Casablanca', 'America/Santiago', 'Etc/GMT+5']
+
+def zoneinfo_local_ns(ns: np.ndarray, tz: str) -> np.ndarray:
+	local = pd.DatetimeIndex(ns.astype('datetime64[ns]')).tz_localize('UTC').tz_convert(ZoneInfo(tz)).tz_localize(None)
+	return local.values.astype('datetime64[ns]').astype(np.int64)
+
+@pytest.mark.parametrize('tz', zones)
+def test_same_as_zoneinfo(tz):
+	offsets = TzOffsets(tz)
+
+	# every 6 hours, and right before and at every transition of the range, including those after 2037
+	start, end = np.datetime64('1970-01-01', 'ns').astype(np.int64), np.datetime64('2099-12-31', 'ns').astype(np.int64)
+	ns = np.arange(start, end, 6 * 3600 * 10**9, dtype=np.int64)
+	transitions = offsets.transitions[(offsets.transitions > start) & (offsets.transitions < end)]
+	ns = np.sort(np.concatenate([ns, transitions, transitions - 10**9]))
+
+	assert (offsets.to_local_ns(ns) == zoneinfo_local_ns(ns, tz)).all()
+
+	days, tzi = offsets.local_time(ns)
+	single = [offsets.local_time_single(d) for d in ns[-2000:].astype('datetime64[ns]')]
+	assert single == list(zip(days[-2000:].tolist(), tzi[-2000:].tolist()))
+
+def test_fixed_offset():
+	for tz, offset in [('UTC', 0), ('Etc/GMT+5', -5 * 3600)]:
+		offsets = TzOffsets(tz)
+		assert offsets.offsets.tolist() == [offset] and len(offsets.transitions) == 1
+
+def test_to_datetime():
+	offsets = TzOffsets('Europe/Berlin')
+	dates = np.array(['2024-03-31T00:59:59', '2024-03-31T01:00:00', '2024-10-27T00:59:59', '2024-10-27T01:00:00'], dtype='datetime64[ns]')
+	ref = pd.DatetimeIndex(dates).tz_localize('UTC').tz_convert('Europe/Berlin')
+
+	local = offsets.to_datetime(dates)
+	assert [d.isoformat() for d in local] == [d.isoformat() for d in ref]
+	assert [d.tzname() for d in local] == [d.tzname() for d in ref] == ['CET', 'CEST', 'CEST', 'CET']
@@ -1,8 +1,16 @@
 # -*- coding: utf-8 -*-
 
-from .tfs import TFs
-from .generic_data import GenericData, ohlc_feature_info
+from .tfs import TFs, Timeframe
+from .dtype_policy import DtypePolicy
+from .generic_data import GenericData, ohlc_feature_info, ohlc_record_dtype
 from indicators import *
 from .live_data import LiveData
 from .sim_data import SimData
+from .tick_aggregator import TickAggregator
+from .resampler import IncrementalResampler
+from .candle_closer import CandleCloser
+from .trading_calendar import TradingCalendar
+from .session_filter import SessionFilter
+from .tz_offsets import TzOffsets
+from .row_view import RowView
 from .vectorbtpro_helpers import get_unix_day_from_date, get_unix_day_from_datetime
\ No newline at end of file
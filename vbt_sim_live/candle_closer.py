@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+import time
+import numpy as np
+from .resampler import resample_keys, resample_end
+
+class CandleCloser():
+
+	"""Completes candles of registered LiveData (and all of their dependents, see LiveData.add_dependent()) once their period
+	has ended by wall-clock time plus a grace period, without waiting for the last source row of the period to come in.
+
+	A candle is closed by setting its cpl (see LiveData.close_latest()), or for dependents by marking its key as closed in the 
+	incremental resampler of the source (see IncrementalResampler.close()), so that later updates of the same candle keep 
+	it complete.
+	The registered LiveData is then cascaded right away, so indicators and strategies see the completed candle.
+
+	grace: time in seconds after the end of a candle period to wait for its last source row before closing it
+	clock: function that returns the current time as (UTC) datetime64, wall-clock time by default. Can be replaced for tests
+		or to run on exchange time.
+
+	poll() needs to be called from the thread that updates the data, e.g. from the loop of the feed handler.
+	run() does this in a loop of its own for a data feed that is driven by callbacks on the same thread.
+	"""
+
+	def __init__(self, grace: float = 2, clock = None):
+		self.grace = np.timedelta64(int(grace * 10**9), 'ns')
+		self.clock = clock if clock is not None else lambda: np.datetime64(time.time_ns(), 'ns')
+		self.registered = []
+
+	def register(self, live_data) -> None:
+
+		"""Register LiveData whose candles and those of its dependents are closed. Dependents added later are included."""
+
+		if live_data not in self.registered:
+			self.registered.append(live_data)
+
+	def unregister(self, live_data) -> None:
+		if live_data in self.registered:
+			self.registered.remove(live_data)
+
+	def deadline(self, live_data) -> np.datetime64 | None:
+
+		"""Return the time the latest candle of live_data will be closed at, or None if it is complete already."""
+
+		if not len(live_data.data['cpl']) or live_data.data['cpl'][-1]:
+			return None
+
+		return resample_end(live_data.data['date'][-1:], live_data.timeframe, live_data.calendar, live_data.session)[0] + self.grace
+
+	def next_deadline(self) -> np.datetime64 | None:
+
+		"""Return the earliest deadline of all registered LiveData and their dependents, or None if there is none."""
+
+		deadlines = [d for d in (self.deadline(ld) for ld in self.walk()) if d is not None]
+		return min(deadlines) if deadlines else None
+
+	def walk(self, live_data = None) -> list:
+
+		"""Return registered LiveData and all of their dependents."""
+
+		nodes = []
+		for ld in (self.registered if live_data is None else [data_target for data_target, realign_info in live_data.dependents]):
+			nodes.append(ld)
+			nodes += self.walk(ld)
+
+		return nodes
+
+	def poll(self) -> list:
+
+		"""Close all candles whose deadline has passed and cascade the registered LiveData they belong to.
+		Returns the LiveData objects whose latest candle was closed.
+		"""
+
+		now = self.clock()
+		closed = []
+
+		for ld in self.registered:
+			if self.close(ld, None, now, closed):
+				ld.cascade()
+
+		return closed
+
+	def close(self, live_data, source, now: np.datetime64, closed: list) -> bool:
+
+		"""Close the latest candles of live_data and its dependents if their deadline has passed, cascading live_data
+		if anything changed. Returns whether the cascade of source (or of live_data itself, if it is registered) is needed.
+		"""
+
+		# dependents first, so their closed keys are in place when live_data is cascaded
+		changed = False
+		for data_target, realign_info in live_data.dependents:
+			changed = self.close(data_target, live_data, now, closed) or changed
+
+		deadline = self.deadline(live_data)
+
+		if deadline is not None and now >= deadline:
+			closed.append(live_data)
+			live_data.log("Closing candle", live_data.data['date'][-1], "of", live_data.timeframe, "at", now)
+
+			if source is not None:
+				resampler = source.get_resampler(live_data.timeframe)
+				key = resample_keys(live_data.data['date'][-1:], live_data.timeframe, live_data.calendar)[0]
+				resampler.close(key)
+
+				# the cascade of the source updates and cascades this candle if its latest row is part of it
+				if resampler.is_current(source.data['date'][-1], key):
+					return True
+
+			live_data.close_latest()
+
+		elif not changed:
+			return False
+
+		if source is not None:
+			live_data.cascade()
+
+		return True
+
+	def run(self, until = None, max_wait: float = 1, sleep = time.sleep) -> None:
+
+		"""Call poll() at every deadline, until the function until returns True (forever if None).
+		Sleeps max_wait seconds at most, so candles that are updated in between are considered.
+		"""
+
+		while until is None or not until():
+			deadline = self.next_deadline()
+			wait = max_wait
+
+			if deadline is not None:
+				wait = min(max_wait, max(0, (deadline - self.clock()) / np.timedelta64(1, 's')))
+
+			sleep(wait)
+			self.poll()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+from fnmatch import fnmatch
+import numpy as np
+
+class DtypePolicy():
+
+	"""Maps features to the dtype they are stored with, in place of type_np of their feature info.
+
+	float_type: dtype for all float64 features, e.g. np.float32 for prices
+	types: dtype per feature name, names can be patterns such as '*_size'. These take precedence over float_type.
+
+	The policy only affects storage. Indicators still calculate in float64 where precision matters and their results
+	are cast when written into the feature arrays. The default policy keeps all dtypes as defined in feature info.
+	"""
+
+	def __init__(self, float_type: np.dtype = np.float64, types: dict = None):
+		self.float_type = np.dtype(float_type)
+		self.types = {n: np.dtype(t) for n, t in (types or {}).items()}
+
+		# feature name -> dtype given by types, or None
+		self.cache = {}
+
+	@classmethod
+	def compact(cls):
+
+		"""Policy that stores prices as float32 and small range integers with the smallest dtype that fits them.
+		Volume is kept as float64, since float32 is only exact for integers up to 2**24.
+		"""
+
+		return cls(np.float32, {
+			'volume': np.float64,
+			'col': np.int8,
+			'num_col': np.int32,
+			'date_hm': np.int16,
+			'date_tz_i': np.int32,
+			'date_tz_d': np.int32,
+			'date_tz_dl': np.int32,
+			'*_size': np.int32,
+		})
+
+	def dtype(self, info: dict) -> np.dtype:
+
+		"""Return the dtype to store a feature with, given its feature info."""
+
+		name = info['name']
+
+		if name not in self.cache:
+			self.cache[name] = next((t for p, t in self.types.items() if fnmatch(name, p)), None)
+
+		t = self.cache[name]
+		if t is not None:
+			return t
+
+		t = np.dtype(info['type_np'])
+		return self.float_type if t == np.float64 else t
+
+	def apply(self, info: dict) -> dict:
+
+		"""Return feature info with type_np set according to this policy."""
+
+		t = self.dtype(info)
+		return info if t == np.dtype(info['type_np']) else dict(info, type_np=t)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+class FeatureSchema():
+
+	"""Registry of feature infos in order of registration.
+	Keeps a name -> column index map, so that lookups and duplicate checks are O(1).
+	"""
+
+	def __init__(self):
+		self.info = []
+		self.names = []
+		self.index = {}
+
+		# incremented whenever features are added
+		self.version = 0
+
+	def __contains__(self, name: str) -> bool:
+		return name in self.index
+
+	def __len__(self) -> int:
+		return len(self.names)
+
+	def add(self, info: dict) -> None:
+
+		"""Register feature info. Raise Exception if feature name already exists"""
+
+		if info['name'] in self.index:
+			raise Exception("Feature name already exists", info['name'])
+
+		self.index[info['name']] = len(self.names)
+		self.info.append(info)
+		self.names.append(info['name'])
+		self.version += 1
+
+	def get(self, name: str) -> dict:
+
+		"""Return feature info for given name, or None"""
+
+		i = self.index.get(name)
+		return None if i is None else self.info[i]
+
+	def dtype(self, name: str) -> np.dtype:
+
+		"""Return numpy dtype for given name, or None"""
+
+		info = self.get(name)
+		return None if info is None else np.dtype(info['type_np'])
+
+class FeatureStore():
+
+	"""Fixed length storage for the feature arrays of LiveData.
+
+	Features of the same dtype are stored as rows of one contiguous 2D block, so that roll, copy and export
+	are a single operation per dtype. Each feature is exposed as a view of the logical length, ordered from
+	oldest to latest value, so that [-1] always addresses the latest candle.
+
+	In default mode, a roll shifts all values one step back (same as before).
+	In ring buffer mode, blocks hold additional slack and a roll only moves the head
+	of the window forward. Once the slack is used up, the window is copied back to the start of the storage,
+	which makes a roll O(1) amortized, independent of the buffer length. Since the views move with every roll
+	(and whenever a block has to grow), consumers need to refresh their references then (see views_version).
+	"""
+
+	def __init__(self, length: int, ring_buffer: bool = False, slack: int = None):
+		self.length = length
+		self.ring_buffer = ring_buffer
+		self.slack = (slack if slack is not None else max(length, 1)) if ring_buffer else 0
+		self.capacity = self.length + self.slack
+		self.start = 0
+
+		# dtype -> 2D block, rows are features
+		self.blocks = {}
+		self.rows_used = {}
+
+		# feature name -> (dtype, row)
+		self.columns = {}
+
+		# incremented whenever views have changed and references to them need to be refreshed
+		self.views_version = 0
+
+	def __contains__(self, name: str) -> bool:
+		return name in self.columns
+
+	def add(self, name: str, data: np.ndarray, dtype: np.dtype = None) -> np.ndarray:
+
+		"""Add (or overwrite) a feature by copying data into its block. Returns the view of the feature."""
+
+		if len(data) != self.length:
+			raise Exception("Feature length mismatch", name, len(data), self.length)
+
+		if name not in self.columns:
+			self.add_column(name, dtype if dtype is not None else np.asarray(data).dtype)
+
+		view = self.view(name)
+		view[:] = data
+		return view
+
+	def allocate(self, name: str, dtype: np.dtype, default) -> np.ndarray:
+
+		"""Add a feature filled with its default value. Returns the view of the feature."""
+
+		return self.add(name, np.full(self.length, default, dtype=dtype), dtype)
+
+	def add_column(self, name: str, dtype: np.dtype) -> None:
+
+		"""Reserve a row for a feature in the block of its dtype, growing the block if required."""
+
+		dtype = np.dtype(dtype)
+		block = self.blocks.get(dtype)
+		used = self.rows_used.get(dtype, 0)
+
+		if block is None or used == block.shape[0]:
+			grown = np.empty((max(2*used, 4), self.capacity), dtype=dtype)
+			if block is not None:
+				grown[:used] = block[:used]
+				self.views_version += 1
+			self.blocks[dtype] = grown
+
+		self.columns[name] = (dtype, used)
+		self.rows_used[dtype] = used + 1
+
+	def locate(self, name: str) -> tuple:
+
+		"""Return the (dtype, row) of a feature in the blocks, which stays the same while the store rolls or blocks grow."""
+
+		try:
+			return self.columns[name]
+		except KeyError:
+			raise Exception("No feature with name", name)
+
+	def latest_column(self, end: int = None) -> int:
+
+		"""Return the storage column of the latest value, or of row end-1 for data restricted to its first end rows."""
+
+		return self.start + (self.length if end is None else end) - 1
+
+	def view(self, name: str) -> np.ndarray:
+
+		"""Return the ordered view of a feature."""
+
+		dtype, row = self.columns[name]
+		return self.blocks[dtype][row, self.start:self.start + self.length]
+
+	def views(self) -> dict:
+
+		"""Return ordered views of all features as dict."""
+
+		return {n: self.view(n) for n in self.columns.keys()}
+
+	def windows(self):
+
+		"""Iterate over (dtype, 2D view of used rows in current window)."""
+
+		for dtype, block in self.blocks.items():
+			yield dtype, block[:self.rows_used[dtype], self.start:self.start + self.length]
+
+	def export(self, names: list = None) -> dict:
+
+		"""Return a copy of the given (or all) features as dict, copying one block per dtype."""
+
+		copies = {dtype: w.copy() for dtype, w in self.windows()}
+		names = self.columns.keys() if names is None else names
+		return {n: copies[self.columns[n][0]][self.columns[n][1]] for n in names}
+
+	def copy(self):
+
+		"""Return a snapshot of this store, copying one block per dtype."""
+
+		store = FeatureStore(self.length, self.ring_buffer, self.slack)
+		store.start = self.start
+		store.blocks = {dtype: b.copy() for dtype, b in self.blocks.items()}
+		store.rows_used = dict(self.rows_used)
+		store.columns = dict(self.columns)
+		return store
+
+	def trim(self, length: int):
+
+		"""Return a new store that holds only the latest length values of all features."""
+
+		store = FeatureStore(length, self.ring_buffer)
+		for name in self.columns.keys():
+			store.add(name, self.view(name)[-length:], self.columns[name][0])
+		return store
+
+	def roll(self, n: int = 1) -> bool:
+
+		"""Roll all features n steps back. New slots are populated with the latest value,
+		the same way a shift would leave them. Returns True if views have changed.
+		"""
+
+		if n <= 0 or self.length == 0:
+			return False
+
+		keep = max(self.length - n, 0)
+		last = self.start + self.length - 1
+
+		if not self.ring_buffer:
+			for dtype, s in self.blocks.items():
+				s = s[:self.rows_used[dtype]]
+				if keep: s[:, 0:keep] = s[:, self.length-keep:self.length]
+				s[:, keep:self.length] = s[:, last:last+1]
+			return False
+
+		if self.start + self.length + n <= self.capacity:
+			self.start += n
+			for dtype, s in self.blocks.items():
+				s = s[:self.rows_used[dtype]]
+				s[:, self.start+keep:self.start+self.length] = s[:, last:last+1]
+		else:
+			# slack used up, move window back to the start of the storage
+			for dtype, s in self.blocks.items():
+				s = s[:self.rows_used[dtype]]
+				latest = s[:, last:last+1].copy()
+				if keep: s[:, 0:keep] = s[:, last+1-keep:last+1]
+				s[:, keep:self.length] = latest
+			self.start = 0
+
+		self.views_version += 1
+		return True
@@ -5,6 +5,10 @@ import datetime
 import numpy as np
 import pandas as pd
 from .tfs import TFs
+from .feature_store import FeatureSchema
+from .dtype_policy import DtypePolicy
+from .trading_calendar import TradingCalendar, get_default_calendar
+from .session_filter import SessionFilter
 import vectorbtpro as vbt
 
 ENABLE_DEBUG = False
@@ -23,21 +27,44 @@ ohlc_feature_info = [
 	{'name':'cpl', 'type':bool, 'type_np':np.bool_, 'default':False}		
 ]
 
+# Packed numpy record of an OHLCV update, in the order of ohlc_feature_info (see LiveData.update_record)
+# binary bar messages with the same layout can be decoded with np.frombuffer(msg, dtype=ohlc_record_dtype)
+ohlc_record_dtype = np.dtype([(f['name'], f['type_np']) for f in ohlc_feature_info])
+
 class GenericData():
 	
 	"""Data class that can hold either live or sim data, along with timeframe info and feature information.
 	The timezone tz can be stored along with the data, but will not be used internally for date or date_l.
 	It only affects the output when calling to_df or get_row_range methods of child classes.
+	dtype_policy defines the dtypes features are stored with (see DtypePolicy), by default those of their feature info.
+	calendar defines session days, holidays and half days (see TradingCalendar), by default weekdays without holidays 
+	in timezone tz. The calendar needs to have the same timezone as the data.
+	session defines which candles are kept (see SessionFilter), by default all of them.
 	""" 
    
-	def __init__(self, data: vbt.Data | dict, symbol: str, timeframe: TFs, tz: str, log_handler: Callable):
+	def __init__(self, data: vbt.Data | dict, symbol: str, timeframe: TFs, tz: str, log_handler: Callable, dtype_policy: DtypePolicy = None,
+			calendar: TradingCalendar = None, session: SessionFilter = None):
 		self.data = data
 		self.symbol = symbol
 		self.timeframe = timeframe
 		self.tz = tz
 		self.log_handler = log_handler
-		self.feature_info = []
-		self.feature_names = []
+		self.dtype_policy = dtype_policy or DtypePolicy()
+		self.calendar = calendar or get_default_calendar(tz)
+		
+		# local times of the calendar (days, sessions) and of indicators (see IndicatorBasic) need to be the same
+		if self.calendar.tz != tz:
+			raise Exception("Timezone of calendar does not match timezone of data", self.calendar.tz, tz)
+			
+		if session is not None and session.calendar.tz != tz:
+			raise Exception("Timezone of session calendar does not match timezone of data", session.calendar.tz, tz)
+			
+		self.session = session
+		
+		# feature_info and feature_names are kept by the schema, in order of registration
+		self.schema = FeatureSchema()
+		self.feature_info = self.schema.info
+		self.feature_names = self.schema.names
 		
 		self.indicator_info = None
 		self.strategy_info = None
@@ -101,15 +128,11 @@ class GenericData():
 
 	def add_feature_info(self, info: list) -> None:
 		
-		"""Add feature infos from list. Check and raise Exception if feature name already exists"""
+		"""Add feature infos from list, with type_np according to the dtype policy. Check and raise Exception if feature name already exists"""
 		
 		for i in info:
-			if i['name'] in self.feature_names:
-				raise Exception("Feature name already exists", i['name'])
-			else:
-				self.log("Adding feature info", i, "to", self.timeframe)
-				self.feature_info.append(i)	
-				self.feature_names = [f['name'] for f in self.feature_info]
+			self.log("Adding feature info", i, "to", self.timeframe)
+			self.schema.add(self.dtype_policy.apply(i))
 		
  
 	def get_feature_info(self, name: str=None) -> list:
@@ -119,7 +142,8 @@ class GenericData():
 		if name is None:
 			return self.feature_info
 		else:
-			return [f for f in self.feature_info if f['name'] == name]
+			info = self.schema.get(name)
+			return [] if info is None else [info]
 
 	def get_feature(self, feature_name: str):
 		
@@ -135,7 +159,7 @@ class GenericData():
 		
 		"""Return True if feature exists."""	
 		
-		return f in self.get_feature_names()		    
+		return f in self.schema
 
 	def get_info(self) -> dict:
 		
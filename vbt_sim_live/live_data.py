@@ -1,21 +1,64 @@
 # -*- coding: utf-8 -*-
 
-import datetime
 import indicators as inst
-import numpy_indexed as npi
 import numpy as np
 import pandas as pd
-import pytz
 from typing import Dict, List
 from vbt_sim_live import GenericData, TFs
-from .vectorbtpro_helpers import is_last_day_of_week, is_last_day_of_month
+from .generic_data import ohlc_feature_info
+from .feature_store import FeatureStore
+from .dtype_policy import DtypePolicy
+from .trading_calendar import TradingCalendar, get_default_calendar
+from .tz_offsets import get_tz_offsets
+from .session_filter import SessionFilter
+from .row_view import RowView, rows_to_records
+from .resampler import IncrementalResampler, resample_keys, resample_mask, resample_ohlcv, resample_cpl
+from .realigner import realign_keys, realign_index, realign_gather
 	
 class LiveData(GenericData):
 
-	"""Data class that can holds live data in form of numpy arrays""" 
+	"""Data class that can holds live data in form of numpy arrays.
+	
+	Arrays are kept in a FeatureStore (one contiguous block per dtype) and self.data holds ordered views of them.
+	With ring_buffer=True, a roll does not shift the data but moves the views. References to feature arrays
+	(e.g. from get_feature()) are therefore only valid until the next roll. Indicators and strategies
+	run by this class are re-bound to the new views automatically.
+	""" 
 
-	def __init__(self, data, symbol, timeframe, tz, log_handler = None):
-		super().__init__(data, symbol, timeframe, tz, log_handler)
+	def __init__(self, data, symbol, timeframe, tz, log_handler = None, ring_buffer: bool = False, dtype_policy: DtypePolicy = None,
+			calendar: TradingCalendar = None, session: SessionFilter = None):
+		super().__init__(data, symbol, timeframe, tz, log_handler, dtype_policy, calendar, session)
+		
+		# features are stored with the dtype of their feature info (as given by the dtype policy), grouped into one block per dtype
+		self.store = FeatureStore(len(data['date']), ring_buffer=ring_buffer)
+		for n, d in data.items():
+			self.store.add(n, d, self.schema.dtype(n))
+		self.data = self.store.views()
+		self.ohlc_views = [self.data[f['name']] for f in ohlc_feature_info]
+		
+		# higher timeframes that are resampled from this data, see add_dependent()
+		self.dependents = []
+		
+		# buffer length per timeframe name, as required by indicators and strategies (see from_df())
+		self.buffer_info = {}
+		
+		# cached row views, see row_view()
+		self.row_views = {}
+		
+		# incremental resamplers per target timeframe, see resample()
+		self.resamplers = {}
+		
+		# compiled realign plans per source timeframe name, see get_realign_plan()
+		self.realign_plans = {}
+		
+		# intraday candles outside of the session are disregarded by updates, unless resampled from data that is filtered already
+		self.filter_session = session is not None and timeframe.is_intraday()
+		
+		# number of rows self.data is restricted to while rows are replayed, see set_window()
+		self.window = None
+		
+		# date of the latest candle closed by close_latest(), later updates of it keep it complete
+		self.closed_date = np.datetime64('NaT', 'ns')
 		
 	@classmethod		
 	def from_barlist(cls, bars, timeframe, tz = 'America/New_York'):
@@ -36,32 +79,209 @@ class LiveData(GenericData):
 	)
 
 	@classmethod		
-	def from_df(cls, df: pd.DataFrame, symbol: str, timeframe: TFs, tz: str = 'America/New_York', log_handler = None):
+	def from_df(cls, df: pd.DataFrame, symbol: str, timeframe: TFs, tz: str = 'America/New_York', log_handler = None, ring_buffer: bool = False,
+			indicator_info: dict = None, strategy_info: dict = None, headroom: int = 100, dtype_policy: DtypePolicy = None,
+			calendar: TradingCalendar = None, session: SessionFilter | str | tuple = None):
 
 		"""This method creates a LiveData object based on
 		df: DataFrame with input data, needs to have correct feature names and date as index
 		symbol: ticker to define stock
 		timeframe: timeframe for the given input data (no auto detect)
+		ring_buffer: store features in ring buffer mode, so that a roll is O(1) regardless of the data length
+		indicator_info, strategy_info: if given, the buffer of each timeframe is sized to the largest lookback of its
+			indicators and strategies plus headroom. The input data is trimmed to the history required by this and all
+			higher timeframes, resampled data is trimmed in resample() and this data in prepare_indicators().
+		dtype_policy: dtypes to store features with, e.g. DtypePolicy.compact(). Resampled data inherits the policy.
+		calendar: TradingCalendar with holidays and half days, used for cpl of w1/M1 and ext/pre. Resampled data inherits it.
+		session: keep only intraday candles within the session, 'rth', 'eth' or a window such as ('09:30', '12:00') (see SessionFilter).
+			Other candles are dropped from df and disregarded by updates, so they are never stored, resampled or passed 
+			to indicators. d1 candles are built from the session as well. Resampled data inherits it.
 		
 		Returns a new LiveData object.
 		""" 
+		
+		session = SessionFilter.from_arg(session, calendar or get_default_calendar(tz))
+		
+		# dates are stored as datetime64[ns], whatever the unit of the index (e.g. [us] with pandas 3)
+		date = df.index.values.astype('datetime64[ns]')
+		
+		if session is not None and timeframe.is_intraday():
+			mask = session.mask(date)
+			df, date = df[mask], date[mask]
+		
+		buffer_info = {}
+		
+		for info in [indicator_info, strategy_info]:
+			for tf_name, tf_info in (info or {}).items():
+				buffer_info[tf_name] = max(buffer_info.get(tf_name, 0), inst.get_lookback(tf_info, TFs.from_name(tf_name)) + headroom)
+				
+		if buffer_info:
+			start = cls.get_trim_index(date, timeframe, buffer_info, calendar)
+			df, date = df.iloc[start:], date[start:]
 
 		data = {c: df[c].to_numpy() for c in df.columns}
-		data['date'] = df.index.values
+		data['date'] = date
 				
-		return cls(
+		ld = cls(
 			data = data,
 			symbol = symbol,
 			timeframe = timeframe,
 			tz = tz,
-			log_handler = log_handler
-	)
+			log_handler = log_handler,
+			ring_buffer = ring_buffer,
+			dtype_policy = dtype_policy,
+			calendar = calendar,
+			session = session
+		)
+		ld.buffer_info = buffer_info
+		return ld
+	
+	@staticmethod
+	def get_trim_index(date: np.ndarray, timeframe: TFs, buffer_info: dict, calendar: TradingCalendar = None) -> int:
+
+		"""Return the first index of date that needs to be kept, so that timeframe and all higher timeframes in buffer_info
+		have their required number of candles.
+		"""
+		
+		start = len(date)
+		
+		for tf_name, length in buffer_info.items():
+			tf = TFs.from_name(tf_name)
+			
+			if tf.value < timeframe.value:
+				continue
+			elif tf == timeframe:
+				start = min(start, max(0, len(date) - length))
+			else:
+				keys = resample_keys(date, tf, calendar)
+				candle_starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+				start = min(start, candle_starts[max(0, len(candle_starts) - length)])
+				
+		return start
+		
+	def trim(self, length: int = None) -> None:
+
+		"""This function keeps only the latest length rows of all features, by default the buffer length of this timeframe
+		as given in buffer_info. It must be called before indicators and strategies are created.
+		"""
+		
+		length = length or self.buffer_info.get(self.timeframe.name)
+		
+		if length is None or length >= self.store.length:
+			return
+			
+		if self.indicators or self.strategies:
+			raise Exception("Cannot trim data with existing indicators or strategies", self.symbol, self.timeframe)
+			
+		self.log("Trimming", self.timeframe, "from", self.store.length, "to", length)
+		self.store = self.store.trim(length)
+		self.refresh_views()
+		
+	def prepare_indicators(self, run_args: dict = {}) -> None:
+		
+		"""Trim data to the buffer length required by this timeframe and run batch calculation of indicators."""	
+
+		self.trim()
+		super().prepare_indicators(run_args)
 
 	def add_feature(self, feature_name: str, feature_data: np.ndarray) -> None:
 
-		"""This function will add feature data to the class, and possibly overwrite existing features with the same name."""	
+		"""This function will add feature data to the class, and possibly overwrite existing features with the same name.
+		Feature data is copied into the feature store.
+		"""	
+
+		# indicators write into the views of the store directly, nothing to copy
+		if self.data.get(feature_name) is feature_data:
+			return
+		
+		views_version = self.store.views_version
+		self.data[feature_name] = self.store.add(feature_name, feature_data, self.schema.dtype(feature_name))
+		
+		if views_version != self.store.views_version:
+			self.refresh_views()
+
+	def allocate_features(self, feature_info: list) -> None:
+
+		"""This function adds features filled with their default values to the feature store."""	
+		
+		views_version = self.store.views_version
+		
+		for f in feature_info:
+			self.data[f['name']] = self.store.allocate(f['name'], self.schema.dtype(f['name']), f['default'])
+			
+		if views_version != self.store.views_version:
+			self.refresh_views()
+			
+	def refresh_views(self) -> None:
 
-		self.data[feature_name] = feature_data
+		"""This function updates self.data and all indicators after the views of the feature store have changed."""	
+		
+		views = self.store.views()
+		self.data.update(views if self.window is None else {n: v[:self.window] for n, v in views.items()})
+		self.ohlc_views = [self.data[f['name']] for f in ohlc_feature_info]
+		
+		for ind in self.indicators + self.strategies:
+			self.bind(ind)
+			
+	def set_window(self, end: int | None) -> None:
+
+		"""This function restricts self.data (and all indicators) to the first end rows, so that row end-1 is the latest one,
+		e.g. to replay the rows after it (see cascade()). A roll then moves the end instead of shifting the data.
+		None, or the full length, removes the restriction.
+		"""	
+		
+		self.window = end if end is not None and end < self.store.length else None
+		self.refresh_views()
+		
+	def release_window(self) -> None:
+
+		"""This function removes the restriction of set_window() from this data and all its dependents."""	
+		
+		if self.window is not None:
+			self.set_window(None)
+			
+		for data_target, realign_info in self.dependents:
+			data_target.release_window()
+			
+	def rewind(self, end: int) -> None:
+
+		"""This function restricts data to the first end rows (see set_window()) and brings everything back to the state
+		right after row end-1 had come in: indicators and strategies rebuild their running state from the stored values 
+		(see on_rewind()) and dependents are rewound to the candles they held by then, i.e. up to the candle of the last 
+		source row before end that is part of any candle.
+		"""	
+		
+		dates = self.store.view('date')
+		self.set_window(end)
+		
+		for r in self.resamplers.values():
+			r.reset()
+			
+		for ind in self.indicators + self.strategies:
+			ind.on_rewind()
+			
+		for data_target, realign_info in self.dependents:
+			timeframe = data_target.timeframe
+			mask = resample_mask(dates, timeframe, self.calendar, self.session)
+			included = np.arange(len(dates)) if mask is None else np.flatnonzero(mask)
+			
+			if not len(included):
+				continue
+				
+			keys = resample_keys(dates[included], timeframe, self.calendar)
+			target_keys = resample_keys(data_target.store.view('date'), timeframe, self.calendar)
+			
+			j = np.searchsorted(included, end)
+			target_end = np.searchsorted(target_keys, keys[j-1], side='right') if j else np.searchsorted(target_keys, keys[0])
+			data_target.rewind(max(int(target_end), 1))
+		
+	def bind(self, ind) -> None:
+
+		"""This function points the input and output arrays of an indicator (or strategy) to the current feature views."""	
+
+		for n in list(ind.input_names) + list(ind.output_names):
+			if n in self.data:
+				ind.__dict__[n] = self.data[n]
 		
 	def get_dtype(self, feature_name: str) -> np.dtype:
 
@@ -99,8 +319,8 @@ class LiveData(GenericData):
 		
 		if date_as_datetime:
 			if tz_convert:
-				data[0] = [datetime.datetime.fromtimestamp(d, datetime.timezone.utc).astimezone(pytz.timezone(self.tz)) for d in data[0].astype('datetime64[s]').astype('int64')]
-				data[1] = [datetime.datetime.fromtimestamp(d, datetime.timezone.utc).astimezone(pytz.timezone(self.tz)) for d in data[1].astype('datetime64[s]').astype('int64')]
+				data[0] = get_tz_offsets(self.tz).to_datetime(data[0])
+				data[1] = get_tz_offsets(self.tz).to_datetime(data[1])
 
 			else:
 				data[0] = data[0].astype('datetime64[s]').tolist()
@@ -115,6 +335,72 @@ class LiveData(GenericData):
 		else:
 			return data# self.data['close'][idx_range] 
 		
+	def row_view(self, features: list = None) -> RowView:
+		
+		"""This function returns a cached zero-copy view of the latest row for the given (or all) features,
+		which always reflects the current values and can be re-used for every update.
+		"""
+		
+		key = None if features is None else tuple(features)
+		
+		if key not in self.row_views:
+			self.row_views[key] = RowView(self, features)
+			
+		return self.row_views[key]
+		
+	def get_rows(self, idx_range: range | slice, features: list = None) -> np.ndarray:
+		
+		"""This function returns a number of rows, defined by an index range idx_range, as numpy structured array
+		with the given (or all) features. Dates are kept as datetime64, see row_view.records_to_datetime() for conversion.
+		"""
+		
+		return rows_to_records(self.data, features or self.get_feature_names(), idx_range)
+		
+	@staticmethod
+	def to_datetime64(ts) -> np.datetime64:
+
+		"""Convert a timestamp (np.datetime64, datetime or pd.Timestamp, tz-aware or UTC) into datetime64[ns] UTC without timezone."""	
+		
+		if isinstance(ts, np.datetime64):
+			return ts.astype('datetime64[ns]')
+			
+		ts = pd.Timestamp(ts)
+		if ts.tz is not None:
+			ts = ts.tz_convert('UTC').tz_localize(None)
+		return np.datetime64(ts.value, 'ns')
+		
+	def at_time(self, ts, features: list = None) -> RowView | None:
+		
+		"""This function returns a zero-copy view of the candle that covers timestamp ts, or None if there is no such candle.
+		ts can be tz-aware. The view refers to a fixed row index and is valid until the next roll.
+		The candle covers ts if both have the same key (see resample_keys()), so d1, w1 and M1 candles follow the calendar.
+		"""
+		
+		ts = self.to_datetime64(ts)
+		dates = self.data['date']
+		i = np.searchsorted(dates, ts, side='right') - 1
+		
+		if i < 0:
+			return None
+			
+		keys = resample_keys(np.array([dates[i], ts]), self.timeframe, self.calendar)
+		if keys is None or keys[0] != keys[1]:
+			return None
+			
+		return RowView(self, features, i)
+		
+	def between(self, start = None, end = None, features: list = None) -> dict:
+		
+		"""This function returns zero-copy slices of the given (or all) features for all candles with 
+		start <= date <= end as dict. start and end can be tz-aware, None means no limit.
+		"""
+		
+		dates = self.data['date']
+		i0 = 0 if start is None else np.searchsorted(dates, self.to_datetime64(start), side='left')
+		i1 = len(dates) if end is None else np.searchsorted(dates, self.to_datetime64(end), side='right')
+		
+		return {n: self.get_feature(n)[i0:i1] for n in (features or self.get_feature_names())}
+		
 	def to_df(self, tz_convert: bool = False, set_index: bool = True) -> pd.DataFrame:
 
 		"""This function will convert data to a Pandas DataFrame.
@@ -122,7 +408,7 @@ class LiveData(GenericData):
 		set_index: specifies whether date should be set as index or not
 		"""	
 
-		df = pd.DataFrame(self.data)
+		df = pd.DataFrame(self.store.export(self.get_feature_names()))
 				
 		if tz_convert:
 			#df.index = df.index.tz_convert(self.tz)
@@ -137,6 +423,8 @@ class LiveData(GenericData):
 		"""This function resamples (downsampling) the current OHLCV data into a new LiveData class.
 		timeframe: defines the timeframe of the new class
 		update:  specifies whether we will processing the entire dataset or only the last part, resuling in a single resampled row.
+			The single row is built in O(1) by an IncrementalResampler that is kept per target timeframe. 
+			None is returned if the latest row is not part of any candle, e.g. outside of the session for d1.
 		
 		The general idea is to generate a key that will hold the number of resampled candles since Unix Epoch.
 		This key will then be used to perform groupby. Special attention is required to re-generate date and cpl of the 
@@ -144,90 +432,89 @@ class LiveData(GenericData):
 		"""	
 				
 		if update:
-			start_index = max(0, len(self.data['cpl'])-2*timeframe.value//60)
-		else:
-			start_index = 0
-			
-		date = self.data['date'][start_index:]
-		datel = self.data['date_l'][start_index:]
-		open = self.data['open'][start_index:]
-		high = self.data['high'][start_index:]
-		low = self.data['low'][start_index:]
-		close = self.data['close'][start_index:]
-		volume = self.data['volume'][start_index:]
-		
-		# intraday
-		if timeframe.value < 24*60*60:
-			date_base = date.astype('int64') // 10**9
-			date_base = date_base // timeframe.value
-			
-		# unfortunately, no embedded week function in datetime64
-		elif timeframe.name == "w1":
-			date_base = date.astype('int64') // 10**9 + 345600 # weeks from 1.1.1970, starting the first monday
-			date_base = date_base // timeframe.value		
-		elif timeframe.name == 'M1':
-			date_base = pd.to_datetime(date.astype('datetime64[M]')).astype('int64')
-		else:
-			self.log.error("Error resample(), no valid timeframe for resamling, aborting", timeframe)
+			resampler = self.get_resampler(timeframe)
+			return None if resampler is None else resampler.update(self.data)
+			
+		keys, ret = resample_ohlcv({f['name']: v for f, v in zip(ohlc_feature_info, self.ohlc_views)}, timeframe, self.calendar, self.session)
+		
+		if keys is None:
+			self.log("Error resample(), no valid timeframe for resamling, aborting", timeframe)
 			return None
+			
+		return self.create_resampled(keys, ret, timeframe)
 		
-		groupby = npi.group_by(date_base)
-
-		ret = {}
+	def resample_many(self, timeframes: list, update: bool = False) -> dict:
 
-		keys, ret['date_l'] = groupby.last(datel)
-		keys, ret['open'] = groupby.first(open)	
-		keys, ret['high'] = groupby.max(high)
-		keys, ret['low'] = groupby.min(low)
-		keys, ret['close'] = groupby.last(close)
-		keys, ret['volume'] = groupby.sum(volume)
+		"""This function resamples the current OHLCV data into many timeframes at once, see resample().
 		
-		ret['cpl'] = np.full(len(ret['open']), False, dtype=np.bool_)
+		Returns a dict with timeframe name as key and a new LiveData class (or update rows) as value.
 		
-		if timeframe.value < 24*60*60:
-			ret['date'] = (keys * timeframe.value * 10**9).astype('datetime64[ns]')
+		Timeframes are processed in ascending order and each intraday timeframe is resampled from the largest timeframe
+		processed before that divides it, rather than from the source, e.g. m30 from m5 and m5 from the source.
+		For single updates, the latest source row is read once and passed to the incremental resamplers of all timeframes.
+		"""	
+		
+		if update:
+			latest = {f['name']: v[-1] for f, v in zip(ohlc_feature_info, self.ohlc_views)}
+			rows = {}
 			
-			src_last_entry_complete = self.data['cpl'][-1]			
-			# check if this was the last update within this key
-			next_minute = ret['date_l'][-1].astype('datetime64[s]') + 60#timedelta(minutes=1)
-			next_minute_key = next_minute.astype('int64') // timeframe.value
+			for timeframe in timeframes:
+				resampler = self.get_resampler(timeframe)
+				rows[timeframe.name] = None if resampler is None else resampler.update(self.data, latest)
+					
+			return rows
 			
-			# set last candle status of resampled array if 1m src candle was complete and was last one in this key period
-			last_candle_complete = src_last_entry_complete and next_minute_key != keys[-1]
+		# resampled arrays with cpl of the last source row of each candle, per timeframe
+		partials = []
+		ret = {}
 		
-		elif timeframe.name == 'w1':
-			ret['date'] = ((keys * timeframe.value + 345600-604800) * 10**9 ).astype('datetime64[ns]')
-			last_date = pd.Timestamp(ret['date_l'][-1]).to_pydatetime('utc')
+		for timeframe in sorted(timeframes, key=lambda t: t.value):
+			source = self.data
 			
-			last_candle_complete = is_last_day_of_week(last_date)
+			if timeframe.is_intraday():
+				source = next((p for tf, p in reversed(partials) if timeframe.value % tf.value == 0), source)
 			
-		elif timeframe.name == 'M1':
-			ret['date'] = (keys * 10**9).astype('datetime64[ns]')#.astype('int64')	
-			last_date = pd.Timestamp(ret['date_l'][-1]).to_pydatetime('utc')
+			keys, resampled = resample_ohlcv(source, timeframe, self.calendar, self.session)
 			
-			last_candle_complete = is_last_day_of_month(last_date)
-
-		else:
-			self.log.error("Error resample(), no valid timeframe for resamling, aborting", timeframe)
-			return None		
+			if keys is None:
+				self.log("Error resample(), no valid timeframe for resamling, aborting", timeframe)
+				ret[timeframe.name] = None
+				continue
+				
+			partials.append((timeframe, resampled))
+			ret[timeframe.name] = self.create_resampled(keys, dict(resampled), timeframe)
+			
+		return ret
 		
-		ret['cpl'][:-1] = True
-		ret['cpl'][-1] = last_candle_complete
+	def get_resampler(self, timeframe: TFs) -> IncrementalResampler | None:
 		
-		# in case of update, return last ohlcv row only and avoid creating a new LiveData object
-		if update:
-			return {
-				'date': ret['date'][-1], #datetime.fromtimestamp(ret['date'][-1], pytz.utc),
-				'date_l': ret['date_l'][-1], #datetime.fromtimestamp(ret['date_l'][-1].astype('int64'), pytz.utc),
-				'open': ret['open'][-1],
-				'high': ret['high'][-1],
-				'low': ret['low'][-1],
-				'close': ret['close'][-1],
-				'volume': ret['volume'][-1],
-				'cpl': ret['cpl'][-1],
-			}
-		else:
-			return LiveData(ret, self.symbol, timeframe, self.tz, self.log_handler)
+		"""This function returns the incremental resampler for timeframe, or None for a timeframe that is invalid for resampling."""	
+		
+		if timeframe not in self.resamplers:
+			if resample_keys(self.data['date'][-1:], timeframe, self.calendar) is None:
+				self.log("Error resample(), no valid timeframe for resamling, aborting", timeframe)
+				return None
+				
+			self.resamplers[timeframe] = IncrementalResampler(timeframe, self.calendar, self.session)
+			
+		return self.resamplers[timeframe]
+		
+	def create_resampled(self, keys: np.ndarray, ret: dict, timeframe: TFs):
+		
+		"""This function creates a new LiveData object from resampled arrays (see resample_ohlcv()),
+		setting cpl of all candles but the latest one and trimming it to its buffer length.
+		"""	
+		
+		cpl = np.full(len(keys), True, dtype=np.bool_)
+		cpl[-1:] = resample_cpl(keys[-1:], ret['date_l'][-1:], ret['cpl'][-1:], timeframe, self.calendar, self.session)
+		ret['cpl'] = cpl
+		
+		ld = LiveData(ret, self.symbol, timeframe, self.tz, self.log_handler, ring_buffer=self.store.ring_buffer, dtype_policy=self.dtype_policy,
+			calendar=self.calendar, session=self.session)
+		ld.buffer_info = self.buffer_info
+		ld.filter_session = False
+		ld.trim()
+		return ld
 
 	def realign(self, data_source, realign_info: dict, update: bool = False) -> None:
 
@@ -236,65 +523,94 @@ class LiveData(GenericData):
 		not match both involved data classes, will be disregarded.
 		
 		In case of update=True, we will simply copy/update the last datapoint.
+		
+		Source rows are looked up by key with searchsorted (see realigner), so rows without a source candle are NaN.
+		Nothing is done if no entry of realign_info matches both timeframes.
+		Data can be realigned from d1 as well, where close alignment gives the values of the previous session day
+		(e.g. the prior day high) until the session close.
 		"""	
 		
-		if data_source.timeframe.value <= self.timeframe.value:
-			raise Exception("Can only realign higher timeframes to lower timeframes, not", data_source.timeframe, "to", self.timeframe)
-				
-		for r in realign_info:
+		if update:
+			# When trading live, we want to see how a higher TF value develops,
+			# and receive live updates rather than looking at the previous "close" value.
+			# Therefore, we simply copy the latest HTF value.
+			source_column = data_source.store.latest_column(data_source.window)
+			target_column = self.store.latest_column(self.window)
+			
+			for (source_dtype, source_row), (target_dtype, target_row) in self.get_realign_plan(data_source, realign_info):
+				self.store.blocks[target_dtype][target_row, target_column] = data_source.store.blocks[source_dtype][source_row, source_column]
+			return
 			
-			# consider only realign info that is relevant for these two timeframes involved
+		# nothing to do if no realign info matches both timeframes, e.g. for dependents that are only resampled
+		if not any(r['from'] == data_source.timeframe.name and r['to'] == self.timeframe.name for r in realign_info):
+			return
+			
+		self.check_realign_source(data_source)
+			
+		# the index map from source to target rows is computed once per alignment and shared by all features
+		from_keys = resample_keys(data_source.get_feature('date'), data_source.timeframe, self.calendar)
+		to_dates = self.get_feature('date')
+		
+		index_maps = {}
+		
+		# consider only realign info that is relevant for these two timeframes involved
+		for r in realign_info:
 			if r['from'] == data_source.timeframe.name and r['to'] == self.timeframe.name:
 				
-				realign_from_dates = data_source.get_feature('date')			
-				realign_to_dates = self.get_feature('date')
-				realign_from_values = data_source.get_feature(r['feature'])
-					
-				if update:
-
-					# When trading live, we want to see how a higher TF value develops,
-					# and receive live updates rather than looking at the previous "close" value.
-					# Therefore, we simply copy the latest HTF value.
-					realign_to_values = self.get_feature(r['feature']+r['from'])
-					realign_to_values[-1] = realign_from_values[-1]
+				if r['align'] not in index_maps:
+					to_keys = realign_keys(to_dates, data_source.timeframe, self.timeframe, r['align'], self.calendar, self.session)
+					index_maps[r['align']] = realign_index(from_keys, to_keys)
 					
-				else:
-					self.log("Realigning", r)
+				realigned_column = realign_gather(data_source.get_feature(r['feature']), index_maps[r['align']])
+				
+				self.log("Realigning", r)
 	
-					# create dataframe "to" with date and key
-					df_to = pd.DataFrame()
-					df_to['date'] = realign_to_dates
+				# copy feature info from source and add it to target data
+				# with timeframe "from" appended to name
+				feature_info = data_source.get_feature_info(r['feature'])
+				if len(feature_info) != 1:
+					raise Exception("Unable to get feature info for", r['feature'])
 					
-					# pick the correct key, depending on realignment type "open" or "close"
-					if r['align'] == 'open':
-						df_to['key'] = realign_to_dates.astype('datetime64[s]').astype(np.int64) // TFs[r['from']].value
-					else:
-						df_to['key'] = (realign_to_dates.astype('datetime64[s]').astype(np.int64) - TFs[r['from']].value + 1*TFs[r['to']].value) // TFs[r['from']].value
-
-					# create dataframe "from" with date, key and values to be realigned			
-					df_from = pd.DataFrame()		
-					df_from['date'] = realign_from_dates
-					df_from['key'] = realign_from_dates.astype('datetime64[s]').astype(np.int64) // TFs[r['from']].value
-					df_from['values'] = realign_from_values
-					
-					# merge both DataFrames based on key
-					df_merge = pd.merge(df_to, df_from, how='left', on='key')
-		
-					# copy feature info from source and add it to target data
-					# with timeframe "from" appended to name
-					feature_info = data_source.get_feature_info(r['feature'])
-					if len(feature_info) != 1:
-						raise Exception("Unable to get feature info for", r['feature'])
-						
-					feature_info = dict(feature_info[0])
-					feature_info['name'] += r['from']
-					self.add_feature_info([feature_info])
-
-					# extract realigned values and add new feature data
-					realigned_column = np.array(df_merge['values'].to_numpy(), dtype=feature_info['type_np'])
-					self.add_feature(feature_info['name'], realigned_column)	
+				feature_info = dict(feature_info[0])
+				feature_info['name'] += r['from']
+				self.add_feature_info([feature_info])
+
+				# add new feature data with realigned values
+				self.add_feature(feature_info['name'], realigned_column)	
 				
+	def check_realign_source(self, data_source) -> None:
+		
+		"""This function raises an Exception if features of data_source cannot be realigned into this data."""	
+		
+		if data_source.timeframe.value <= self.timeframe.value:
+			raise Exception("Can only realign higher timeframes to lower timeframes, not", data_source.timeframe, "to", self.timeframe)
 			
+		if data_source.timeframe.is_outsideday() and data_source.timeframe != TFs['d1']:
+			raise Exception("Can only realign intraday and d1 data, not", data_source.timeframe)
+			
+	def get_realign_plan(self, data_source, realign_info: list) -> list:
+		
+		"""This function returns the realign plan for data_source, a list of ((dtype, row) of the source feature, (dtype, row) 
+		of the target feature) in their feature stores for all entries of realign_info that match both timeframes.
+		The plan is compiled on first use and only rebuilt once features are added to either data. It holds no views,
+		so it is kept across rolls and windows, realign() binds the latest column of both stores on every update.
+		"""	
+		
+		version = (self.store, self.schema.version, data_source.store, data_source.schema.version)
+		plan = self.realign_plans.get(data_source.timeframe.name)
+		
+		if plan is None or plan[0] is not data_source or plan[1] is not realign_info or plan[2] != version:
+			pairs = [(data_source.store.locate(r['feature']), self.store.locate(r['feature']+r['from'])) for r in realign_info 
+				if r['from'] == data_source.timeframe.name and r['to'] == self.timeframe.name]
+			
+			if pairs:
+				self.check_realign_source(data_source)
+				
+			plan = (data_source, realign_info, version, pairs)
+			self.realign_plans[data_source.timeframe.name] = plan
+			
+		return plan[3]
+	
 	def run_indicators(self, info: dict, run_args: dict={}) -> []:
 
 		"""This function will run a specific indicator (or strategy) on the current timeframe. 
@@ -324,9 +640,19 @@ class LiveData(GenericData):
 			vbt_indicator = getattr(inst, i[0])
 			live_indicator = getattr(inst, i[0] + "_")
 			
+			# find feature info, add it and allocate outputs in the feature store
+			feature_info = getattr(inst, i[0] + "_feature_info")
+			
+			feature_info_names = [f['name'] for f in feature_info]
+			if feature_info_names != list(vbt_indicator.output_names):
+				raise Exception("Feature info and output names do not match for indicator/strategy", i[0], feature_info_names, vbt_indicator.output_names)
+			
+			self.add_feature_info(feature_info)
+			self.allocate_features(feature_info)
+			
 			# collect input arguments from IF definitions
 			input_args = [self.get_feature(n) for n in vbt_indicator.input_names]
-			input_args += [i[1].get(n, None) for n in vbt_indicator.param_names]
+			input_args += [i[1].get(n, live_indicator.param_defaults.get(n)) for n in vbt_indicator.param_names]
 	
 			input_args_is_none = [n is None for n in input_args]
 				
@@ -334,10 +660,13 @@ class LiveData(GenericData):
 				missing_fields = [n for i, n in enumerate(vbt_indicator.input_names + vbt_indicator.param_names) if input_args_is_none[i] ]
 				raise Exception("Could not populate all input args, missing", missing_fields)
 			
-			# assembly kwargs
+			# assembly kwargs, live_data allows the indicator to create its outputs in our feature store
 			kwargs = {
 				'timeframe': self.timeframe,
 				'tz': self.tz,
+				'live_data': self,
+				'dtype_policy': self.dtype_policy,
+				'calendar': self.calendar,
 				}
 			kwargs.update(run_args)
 			
@@ -347,17 +676,13 @@ class LiveData(GenericData):
 			ret = ind.get()
 			indicators.append(ind)
 			
-			# find feature info and add
-			feature_info = getattr(inst, i[0] + "_feature_info")
-			self.add_feature_info(feature_info)
-			
-			feature_info_names = [f['name'] for f in feature_info]
-			if feature_info_names != list(vbt_indicator.output_names):
-				raise Exception("Feature info and output names do not match for indicator/strategy", i[0], feature_info_names, vbt_indicator.output_names)
-			
-			# add feature data
+			# add feature data, this is a copy in case prepare() has created new arrays
 			for i,n in enumerate(vbt_indicator.output_names):
 				self.add_feature(n, ret[i])
+			
+		# let the indicators work on the stored arrays from now on
+		for ind in indicators:
+			self.bind(ind)
 				
 		return indicators
 
@@ -386,7 +711,207 @@ class LiveData(GenericData):
 
 			for i,n in enumerate(ind.output_names):
 				self.add_feature(n, ret[i])				
+	
+	def add_dependent(self, data_target, realign_info: list = []) -> None:
+
+		""" This function registers a higher timeframe LiveData object that is resampled from this data.
+		Dependents are brought up to date by cascade(), where entries of realign_info that match both timeframes
+		are realigned back into this data.
+		"""
+		
+		if data_target.timeframe.value <= self.timeframe.value:
+			raise Exception("Dependent timeframe must be higher than", self.timeframe, "not", data_target.timeframe)
+
+		# the state of the current candle is taken before the first roll, which may drop its first rows from the buffer
+		resampler = self.get_resampler(data_target.timeframe)
+		if resampler is not None and len(self.data['date']):
+			resampler.rebuild(self.data)
+
+		self.dependents.append((data_target, realign_info))
+	
+	def cascade(self, count: int = 1) -> None:
+
+		""" This function brings everything that depends on the latest count OHLCV rows up to date:
+		resampling into dependents (which cascade themselves), indicators, realignment and strategies.
+		
+		For count > 1, data is rewound to the row before these rows (see rewind()), and they are replayed one by one as new 
+		candles. Each row therefore receives the same values as with single updates, in particular the intermediate values of
+		the higher timeframe candles it is realigned from. Running state of indicators is rebuilt from the stored values though, 
+		which may differ from single updates by rounding (or, for RSI, by the state before the first row of the buffer).
+		"""
+		
+		count = min(count, self.store.length)
+		if count <= 0:
+			return
+			
+		if count > 1:
+			# the first row of the buffer has no row before it to rewind to, it is updated as is
+			start = max(self.store.length - count, 1)
+			self.rewind(start)
+			if start > self.store.length - count:
+				self.cascade()
+			
+			for i in range(start, self.store.length):
+				self.roll()
+				self.cascade()
 				
+			self.release_window()
+			return
+		
+		rows = self.resample_many([data_target.timeframe for data_target, realign_info in self.dependents], update=True)
+		
+		for data_target, realign_info in self.dependents:
+			row = rows[data_target.timeframe.name]
+			
+			if row is None:
+				# latest row is not part of any candle of the dependent
+				continue
+				
+			# indicators and strategies of the dependent only need an update if its candle has actually changed
+			changed = not data_target.is_latest(row)
+			data_target.update(row)
+			if changed: data_target.cascade()
+				
+		self.update_indicators()
+		
+		# dependents that are only resampled (e.g. w1 and M1 from d1) have nothing to realign
+		for data_target, realign_info in self.dependents:
+			if realign_info:
+				self.realign(data_target, realign_info, update=True)
+			
+		self.update_strategies()
+			
+	def update_many(self, rows: pd.DataFrame | dict) -> tuple[int, int]:
+		
+		""" This function updates OHLCV with many rows at once, e.g. to catch up after a reconnect,
+		and cascades the update to dependents, indicators and strategies (see cascade()).
+		
+		rows: DataFrame with date as index (or column), or dict of arrays. Must include feature 
+		names as defined in generic_data.
+		
+		The data is shifted only once and all rows are written in a single slice assignment, then these rows are replayed
+		one by one (see set_window()). The result is the same as for updating row by row: outdated rows and rows outside
+		of the session are dropped, the last row for the same date wins and realigned features receive the intermediate 
+		values of the higher timeframe candles. Batches longer than the buffer are processed in chunks, so that every row is replayed.
+		
+		Returns the number of latest rows that were updated and the number of rolls.
+		"""
+		
+		if isinstance(rows, pd.DataFrame):
+			rows_dict = {c: rows[c].to_numpy() for c in rows.columns}
+			if 'date' not in rows_dict:
+				rows_dict['date'] = rows.index.values
+		else:
+			rows_dict = rows
+			
+		date = np.asarray(rows_dict['date'], dtype='datetime64[ns]')
+		
+		if self.filter_session and len(date):
+			in_session = self.session.mask(date)
+			rows_dict = {k: np.asarray(v)[in_session] for k, v in rows_dict.items()}
+			date = date[in_session]
+			
+		if not len(date):
+			return 0, 0
+			
+		# a row is dropped if an earlier row (or the current candle) is newer
+		last = self.data['date'][-1]
+		newest = np.maximum.accumulate(np.concatenate(([last], date)))[:-1]
+		idx = np.flatnonzero(date >= newest)
+		
+		if not len(idx):
+			return 0, 0
+		
+		# a later row with the same date overwrites an earlier one
+		idx = idx[np.append(date[idx][1:] != date[idx][:-1], True)]
+		rolls = len(idx) - int(date[idx[0]] == last)
+		
+		# rows are replayed on the buffer shortened by the rows of the chunk, half of it is kept for the updates to look back
+		size = max(self.store.length // 2, 1)
+		
+		for chunk in range(0, len(idx), size):
+			chunk_idx = idx[chunk:chunk + size]
+			count = len(chunk_idx)
+			chunk_rolls = count - int(date[chunk_idx[0]] == self.data['date'][-1])
+			
+			# indicators are notified of the new candles once these are replayed
+			if self.store.roll(chunk_rolls):
+				self.refresh_views()
+			
+			self.data['date'][-count:] = date[chunk_idx]
+			for f in ['date_l', 'open', 'high', 'low', 'close', 'volume', 'cpl']:
+				self.data[f][-count:] = np.asarray(rows_dict[f])[chunk_idx]
+			
+			# rows are replayed one by one, starting from the latest row before the update
+			self.set_window(self.store.length - chunk_rolls)
+			for r in self.resamplers.values():
+				r.reset()
+				
+			if count > chunk_rolls:
+				self.cascade()
+				
+			for i in range(chunk_rolls):
+				self.roll()
+				self.cascade()
+		
+		return min(len(idx), self.store.length), rolls
+	
+	def revise(self, row: pd.Series | dict) -> bool:
+		
+		""" This function patches an existing candle in place, e.g. a corrected bar that comes in late,
+		and propagates the revision by replaying the rows from the revised one onward (see cascade()): dependents 
+		(see add_dependent()), indicators, realignment and strategies get the same values as if the revised row had come in
+		instead of the original one. Dependent candles that started before the first row of the buffer cannot be rebuilt though.
+		
+		row: revised candle information, same as for update().
+		
+		Returns whether a candle was revised. Rows with a date that does not exist are disregarded,
+		new candles need to go through update().
+		"""
+		
+		if isinstance(row, pd.core.series.Series):
+			date = row.name
+		else:
+			date = row['date']
+			
+		dates = self.data['date']
+		i = np.searchsorted(dates, np.datetime64(date, 'ns'))
+		
+		if i == len(dates) or dates[i] != date:
+			self.log("Disregarding revision, no candle for", date, "in", self.timeframe)
+			return False
+			
+		for f in ['date_l', 'open', 'high', 'low', 'close', 'volume', 'cpl']:
+			self.data[f][i] = row[f]
+			
+		count = len(dates) - i
+		
+		# the latest row is revised like an update of the current candle
+		if count == 1:
+			for r in self.resamplers.values():
+				r.reset()
+				
+		self.cascade(count)
+		
+		return True
+		
+	def close_latest(self) -> None:
+
+		""" This function marks the latest candle as complete before its last row has come in, e.g. once its period has ended
+		(see CandleCloser). Late updates of the same candle are still applied, but keep it complete.
+		"""
+		
+		self.data['cpl'][-1] = True
+		self.closed_date = self.data['date'][-1]
+		
+	def is_latest(self, row: dict) -> bool:
+
+		""" This function returns True if row equals the latest candle in OHLCV and cpl, date_l is disregarded."""
+		
+		d, dl, o, h, l, c, v, cp = self.ohlc_views
+		return (len(d) > 0 and row['date'] == d[-1] and row['open'] == o[-1] and row['high'] == h[-1] and row['low'] == l[-1]
+			and row['close'] == c[-1] and row['volume'] == v[-1] and row['cpl'] == cp[-1])
+		
 	def update(self, row: pd.Series | dict) -> tuple[bool, bool]:
 
 		""" This function updates OHLCV based on new information given in row.
@@ -395,28 +920,49 @@ class LiveData(GenericData):
 		names as defined in generic_data.
 			
 		Returns whether an update was performed and if it included a roll.
-		A roll is a data shift once a new candle has opened.
+		A roll is a data shift once a new candle has opened. Rows that are older than the current candle are disregarded,
+		see revise() for corrections of earlier candles, as well as rows outside of the session (see from_df()).
+		A candle that has been closed already (see close_latest()) stays complete.
 		
 		Note: row must provide the full information for the current (or new) candle. If only tick data is available,
 		a candle must be aggregated from those ticks in a previous step, in order to create candle updates for
-		this function.
+		this function. TickAggregator does this for batches of trades.
 		"""
 		
 		if isinstance(row, pd.core.series.Series):
-			row_dict = row.to_dict()
-			row_dict['date'] = row.name
+			date = row.name
 		else:
-			row_dict = row
+			date = row['date']
 			
+		return self.update_values(date, row['date_l'], row['open'], row['high'], row['low'], row['close'], row['volume'], row['cpl'])
+
+	def update_record(self, record: np.void | np.ndarray) -> tuple[bool, bool]:
+
+		""" This function updates OHLCV based on a numpy structured record of dtype ohlc_record_dtype,
+		e.g. a record that is re-used by a feed handler to decode binary bar messages. See update().
+		"""
+		
+		return self.update_values(record['date'], record['date_l'], record['open'], record['high'], record['low'], record['close'], record['volume'], record['cpl'])
+		
+	def update_values(self, date, date_l, open, high, low, close, volume, cpl) -> tuple[bool, bool]:
+
+		""" This function updates OHLCV based on positional scalars in the order of ohlc_feature_info,
+		writing them straight into the arrays without creating intermediate objects. See update().
+		"""
+		
 		roll = True
+		dates = self.ohlc_views[0]
+		
+		if self.filter_session and not self.session.contains(date):
+			return False, False
 	
-		if len(self.data['date']):
+		if len(dates):
 					
-			if row_dict['date'] < self.data['date'][-1]:
+			if date < dates[-1]:
 				# abort if outdated info comes in
 				return False, False
 		
-			elif row_dict['date'] == self.data['date'][-1]:
+			elif date == dates[-1]:
 				roll = False
 				
 		# we need to shift/roll in case will be adding new data, not updating the current candle
@@ -424,23 +970,32 @@ class LiveData(GenericData):
 			self.roll()
 		
 		# in any case, new data will go into the last row
-		self.data['date'][-1] = row_dict['date']
-		self.data['date_l'][-1] = row_dict['date_l']
-		self.data['open'][-1] = row_dict['open']
-		self.data['high'][-1] = row_dict['high']
-		self.data['low'][-1] = row_dict['low']
-		self.data['close'][-1] = row_dict['close']
-		self.data['volume'][-1] = row_dict['volume']
-		self.data['cpl'][-1] = row_dict['cpl']
+		d, dl, o, h, l, c, v, cp = self.ohlc_views
+		d[-1] = date
+		dl[-1] = date_l
+		o[-1] = open
+		h[-1] = high
+		l[-1] = low
+		c[-1] = close
+		v[-1] = volume
+		cp[-1] = cpl or (not roll and d[-1] == self.closed_date)
 		
 		return True, roll
 		
-	def roll(self):
+	def roll(self, n: int = 1):
 
-		"""rolls all numpy arrays 1 step back for each feature name.
+		"""rolls all numpy arrays n steps back for each feature name.
 		We work with fixed array sizes and therefore copy the data instead
 		of re-creating arrays (which np.roll() would do).
+		In ring buffer mode, only the views are moved and indicators are re-bound to them.
+		While data is restricted to its first rows (see set_window()), the end of the window is moved instead.
+		Indicators and strategies are notified by on_roll(), e.g. to commit their running state.
 		"""
 		
-		for f in self.get_feature_names():
-			self.data[f][0:-1] = self.data[f][1:]	
\ No newline at end of file
+		if self.window is not None:
+			self.set_window(self.window + n)
+		elif self.store.roll(n):
+			self.refresh_views()
+			
+		for ind in self.indicators + self.strategies:
+			ind.on_roll(n)	
\ No newline at end of file
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from .tfs import TFs
+from .trading_calendar import TradingCalendar, get_default_calendar
+from .session_filter import SessionFilter
+from .resampler import resample_keys, get_session
+
+def realign_keys(to_dates: np.ndarray, tf_from: TFs, tf_to: TFs, align: str, calendar: TradingCalendar = None,
+		session: SessionFilter = None) -> np.ndarray:
+
+	"""Return the key (see resample_keys()) of the candle of timeframe tf_from that candles of timeframe tf_to given
+	by to_dates are realigned from.
+
+	align 'open': the candle that contains the tf_to candle, including its in-progress value
+	align 'close': the latest candle that is complete by the end of the tf_to candle. For d1, this is the candle of the
+		same day once the tf_to candle ends at the session close (see get_session()), otherwise the one of the previous session day.
+	"""
+
+	if align == 'open':
+		return resample_keys(to_dates, tf_from, calendar)
+
+	to_ends = to_dates + np.timedelta64(tf_to.value, 's')
+
+	if tf_from.name != 'd1':
+		return resample_keys(to_ends, tf_from, calendar) - 1
+
+	calendar = calendar or get_default_calendar()
+	days = calendar.day_index(to_dates)
+
+	previous_days = calendar.session_days[np.maximum(np.searchsorted(calendar.session_days, days) - 1, 0)]
+	complete = calendar.is_session_day(days) & (to_ends >= get_session(session, calendar).end_of_session(days))
+
+	return np.where(complete, days, previous_days)
+
+def realign_index(from_keys: np.ndarray, to_keys: np.ndarray) -> np.ndarray:
+
+	"""Return the index of the row in from_keys (sorted) for each of to_keys, or -1 if there is no row with that key."""
+
+	if not len(from_keys):
+		return np.full(len(to_keys), -1)
+
+	idx = np.minimum(np.searchsorted(from_keys, to_keys), len(from_keys) - 1)
+	return np.where(from_keys[idx] == to_keys, idx, -1)
+
+def realign_gather(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+
+	"""Return values at idx (see realign_index()), where rows without a source row are NaN (NaT, or 0 for other dtypes)."""
+
+	missing = idx < 0
+
+	if not len(values):
+		values = np.zeros(1, dtype=values.dtype)
+
+	ret = values[np.maximum(idx, 0)]
+
+	if missing.any():
+		if ret.dtype.kind == 'f':
+			ret[missing] = np.nan
+		elif ret.dtype.kind == 'M':
+			ret[missing] = np.datetime64('NaT')
+		else:
+			ret[missing] = 0
+
+	return ret
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from .tfs import TFs
+from .trading_calendar import TradingCalendar, get_default_calendar
+from .session_filter import SessionFilter
+
+def resample_keys(date: np.ndarray, timeframe: TFs, calendar: TradingCalendar = None) -> np.ndarray:
+
+	"""Return the key for each date that holds the number of resampled candles since Unix Epoch, or None for an invalid timeframe.
+	For d1, the key is the day index in the timezone of the calendar.
+	"""
+
+	# intraday, seconds since Unix Epoch whatever the unit of date
+	if timeframe.value < 24*60*60:
+		date_base = date.astype('datetime64[s]').astype('int64')
+		date_base = date_base // timeframe.value
+
+	elif timeframe.name == 'd1':
+		date_base = (calendar or get_default_calendar()).day_index(date)
+
+	# unfortunately, no embedded week function in datetime64
+	elif timeframe.name == "w1":
+		date_base = date.astype('datetime64[s]').astype('int64') + 345600 # weeks from 1.1.1970, starting the first monday
+		date_base = date_base // timeframe.value
+	elif timeframe.name == 'M1':
+		date_base = date.astype('datetime64[M]').astype('datetime64[s]').astype('int64')
+	else:
+		return None
+
+	return date_base
+
+def resample_dates(keys: np.ndarray, timeframe: TFs, calendar: TradingCalendar = None) -> np.ndarray:
+
+	"""Return the date of each resampled candle given by its key, see resample_keys().
+	d1 candles are dated at midnight in the timezone of the calendar, same as daily source data.
+	"""
+
+	if timeframe.value < 24*60*60:
+		return (keys * timeframe.value * 10**9).astype('datetime64[ns]')
+	elif timeframe.name == 'd1':
+		return (calendar or get_default_calendar()).midnight(keys)
+	elif timeframe.name == 'w1':
+		return ((keys * timeframe.value + 345600-604800) * 10**9 ).astype('datetime64[ns]')
+	else:
+		return (keys * 10**9).astype('datetime64[ns]')
+
+def get_session(session: SessionFilter, calendar: TradingCalendar) -> SessionFilter:
+
+	"""Return the session d1 candles are built from, the regular session of the calendar if session is None."""
+
+	return session or SessionFilter('rth', calendar)
+
+def resample_end(date: np.ndarray, timeframe: TFs, calendar: TradingCalendar = None, session: SessionFilter = None) -> np.ndarray:
+
+	"""Return the time each candle given by its (resampled) date ends at. Intraday candles end after their timeframe,
+	d1 candles at the session close, w1 and M1 candles at the session close of the last session day of the week or month.
+	The session close is the end of session if given, see get_session().
+	"""
+
+	if timeframe.value < 24*60*60:
+		return date + np.timedelta64(timeframe.value, 's')
+
+	calendar = calendar or get_default_calendar()
+
+	# d1 candles are dated at local midnight, w1 and M1 candles at midnight UTC
+	if timeframe.name == 'd1':
+		days = calendar.day_index(date)
+	elif timeframe.name == 'w1':
+		days = calendar.to_day(date)
+		days = calendar.week_ends[np.minimum(np.searchsorted(calendar.week_ends, days), len(calendar.week_ends)-1)]
+	else:
+		days = calendar.to_day(date)
+		days = calendar.month_ends[np.minimum(np.searchsorted(calendar.month_ends, days), len(calendar.month_ends)-1)]
+
+	return get_session(session, calendar).end_of_session(days)
+
+def resample_mask(date: np.ndarray, timeframe: TFs, calendar: TradingCalendar = None, session: SessionFilter = None) -> np.ndarray | None:
+
+	"""Return which source rows are part of the resampled candles, or None if all are.
+	d1 candles are built from (intraday) source rows within the session only, see get_session().
+	"""
+
+	if timeframe.name == 'd1':
+		return get_session(session, calendar).mask(date)
+
+	return None
+
+def resample_ohlcv(data: dict, timeframe: TFs, calendar: TradingCalendar = None, session: SessionFilter = None) -> tuple[np.ndarray, dict] | tuple[None, None]:
+
+	"""Resample OHLCV arrays given as dict into timeframe. Data can be source data or resampled data of a lower timeframe,
+	as long as its candles are fully contained in the candles of timeframe. Source rows outside of the session are 
+	disregarded for d1 (see resample_mask()).
+
+	Since dates are sorted, so are the keys, and each candle is a contiguous run of rows. Candles are therefore reduced
+	with a single ufunc.reduceat per feature over the run starts, or picked at run starts and ends.
+
+	Returns the keys and a dict of arrays of the resampled candles, where cpl holds the cpl of the last row of each candle
+	(see resample_cpl()), or None, None for an invalid timeframe.
+	"""
+
+	keys = resample_keys(data['date'], timeframe, calendar)
+
+	if keys is None:
+		return None, None
+
+	mask = resample_mask(data['date'], timeframe, calendar, session)
+
+	if mask is not None:
+		data = {n: data[n][mask] for n in ['date', 'date_l', 'open', 'high', 'low', 'close', 'volume', 'cpl']}
+		keys = keys[mask]
+
+	if not len(keys):
+		return keys, {n: data[n][:0] for n in ['date', 'date_l', 'open', 'high', 'low', 'close', 'volume', 'cpl']}
+
+	starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+	ends = np.append(starts[1:], len(keys)) - 1
+	keys = keys[starts]
+
+	ret = {}
+
+	ret['date_l'] = data['date_l'][ends]
+	ret['open'] = data['open'][starts]
+	ret['high'] = np.maximum.reduceat(data['high'], starts)
+	ret['low'] = np.minimum.reduceat(data['low'], starts)
+	ret['close'] = data['close'][ends]
+	ret['volume'] = np.add.reduceat(data['volume'], starts)
+	ret['cpl'] = data['cpl'][ends]
+	ret['date'] = resample_dates(keys, timeframe, calendar)
+
+	return keys, ret
+
+def resample_cpl(keys: np.ndarray, date_l: np.ndarray, src_complete: np.ndarray, timeframe: TFs, calendar: TradingCalendar = None,
+		session: SessionFilter = None) -> np.ndarray:
+
+	"""Return cpl of resampled candles, as it is set when the last row of each candle came in,
+	given the cpl of this row (src_complete) and its date_l. d1 candles are complete at the session close, 
+	w1 and M1 candles with the last session day of the week or month, as given by the calendar.
+	"""
+
+	if timeframe.value < 24*60*60:
+		# complete if 1m src candle was complete and was last one in this key period
+		next_minute_key = (date_l.astype('datetime64[s]').astype('int64') + 60) // timeframe.value
+		return src_complete & (next_minute_key != keys)
+
+	calendar = calendar or get_default_calendar()
+	days, tzi = calendar.local_time(date_l)
+	
+	if timeframe.name == 'd1':
+		return src_complete & (tzi + 60 >= get_session(session, calendar).window(days)[1])
+	elif timeframe.name == 'w1':
+		return src_complete & calendar.is_last_day_of_week(days)
+	else:
+		return src_complete & calendar.is_last_day_of_month(days)
+
+class IncrementalResampler():
+
+	"""Resamples the latest row of LiveData into a higher timeframe in O(1), see LiveData.resample(update=True).
+
+	The aggregate of all source rows of the current resampled candle except the latest one is kept (committed rows).
+	The latest source row is pending, since it may still be updated, and is read from the source on every update.
+	Once a new source row comes in, the pending row is committed, or a new candle is started if the new row belongs to
+	the next key. In any other case (the source has been rolled more than once or has been revised in between),
+	the state is rebuilt from the source arrays. reset() forces this, e.g. after update_many() or revise().
+	
+	Source rows that are not part of any candle (see resample_mask()) are never committed, updates for them return None.
+	
+	Candles up to the closed key (see close()) are returned as complete, whatever the cpl of the source.
+	"""
+
+	def __init__(self, timeframe: TFs, calendar: TradingCalendar = None, session: SessionFilter = None):
+		self.timeframe = timeframe
+		self.calendar = calendar or get_default_calendar()
+		self.session = session
+		self.closed_key = None
+		self.reset()
+
+	def reset(self) -> None:
+
+		"""Drop the state, it will be rebuilt from the source arrays on the next update."""
+
+		self.key = None
+		self.key_date = None
+		self.date = None
+		self.included = True
+
+		# aggregate of committed rows
+		self.count = 0
+		self.open = np.nan
+		self.high = np.nan
+		self.low = np.nan
+		self.volume = 0
+
+	def rebuild(self, data: dict) -> None:
+
+		"""Rebuild the state from the source arrays."""
+
+		start = max(0, len(data['date']) - 2*self.timeframe.value//60)
+		dates = data['date'][start:]
+		keys = resample_keys(dates, self.timeframe, self.calendar)
+		mask = resample_mask(dates, self.timeframe, self.calendar, self.session)
+		mask = np.full(len(keys), True) if mask is None else mask
+
+		# current key is the one of the latest row that is part of a candle
+		self.date = dates[-1]
+		self.included = mask[-1]
+		self.key = None
+		self.count = 0
+		
+		if not mask.any():
+			return
+
+		self.set_key(keys[mask][-1])
+		
+		# committed rows are all rows of the current key but the latest one
+		committed = np.flatnonzero(mask[:-1] & (keys[:-1] == self.key)) + start
+		self.count = len(committed)
+
+		if self.count:
+			self.open = data['open'][committed[0]]
+			self.high = data['high'][committed].max()
+			self.low = data['low'][committed].min()
+			self.volume = data['volume'][committed].sum()
+
+	def close(self, key) -> None:
+
+		"""Mark candles up to key as complete, e.g. by CandleCloser once their period has ended. This is kept on reset()."""
+
+		if self.closed_key is None or key > self.closed_key:
+			self.closed_key = key
+
+	def is_current(self, date: np.datetime64, key) -> bool:
+
+		"""Return whether the state follows the source row given by date and this row is part of the candle given by key."""
+
+		return self.date == date and self.included and self.key == key
+
+	def set_key(self, key) -> None:
+
+		"""Start the resampled candle given by key."""
+
+		self.key = key
+		self.key_date = resample_dates(np.array([key]), self.timeframe, self.calendar)[0]
+		self.count = 0
+
+	def commit(self, data: dict, i: int) -> None:
+
+		"""Add source row i to the committed rows."""
+
+		if self.count:
+			self.high = np.maximum(self.high, data['high'][i])
+			self.low = np.minimum(self.low, data['low'][i])
+			self.volume = self.volume + data['volume'][i]
+		else:
+			self.open = data['open'][i]
+			self.high = data['high'][i]
+			self.low = data['low'][i]
+			self.volume = data['volume'][i]
+
+		self.count += 1
+
+	def update(self, data: dict, latest: dict = None) -> dict | None:
+
+		"""Return the resampled candle of the latest source row of data (dict of source arrays) as dict,
+		or None if the latest row is not part of any candle. latest can pass the latest source row as dict, 
+		if it has been read before. The timeframe needs to be valid for resampling (see resample_keys()).
+		"""
+
+		if latest is None:
+			latest = {n: data[n][-1] for n in ['date', 'date_l', 'open', 'high', 'low', 'close', 'volume', 'cpl']}
+
+		dates = data['date']
+		date = latest['date']
+
+		if self.date is None or date < self.date:
+			self.rebuild(data)
+
+		elif date > self.date:
+			if len(dates) > 1 and dates[-2] == self.date:
+				if self.included:
+					self.commit(data, -2)
+					
+				key = resample_keys(np.array([date]), self.timeframe, self.calendar)[0]
+				mask = resample_mask(np.array([date]), self.timeframe, self.calendar, self.session)
+				self.included = True if mask is None else mask[0]
+
+				if self.included and key != self.key:
+					self.set_key(key)
+
+				self.date = date
+			else:
+				self.rebuild(data)
+
+		if not self.included:
+			return None
+			
+		if self.count:
+			open = self.open
+			high = np.maximum(self.high, latest['high'])
+			low = np.minimum(self.low, latest['low'])
+			volume = self.volume + latest['volume']
+		else:
+			open = latest['open']
+			high = latest['high']
+			low = latest['low']
+			volume = latest['volume']
+
+		return {
+			'date': self.key_date,
+			'date_l': latest['date_l'],
+			'open': open,
+			'high': high,
+			'low': low,
+			'close': latest['close'],
+			'volume': volume,
+			'cpl': self.is_complete(latest['cpl'], latest['date_l']),
+		}
+
+	def is_complete(self, src_complete: bool, date_l: np.datetime64) -> bool:
+
+		"""Return whether the resampled candle is complete after a source row with cpl src_complete and date_l came in."""
+
+		if self.closed_key is not None and self.key <= self.closed_key:
+			return True
+
+		if self.timeframe.value < 24*60*60:
+			# set status if 1m src candle was complete and was last one in this key period
+			next_minute_key = (date_l.astype('datetime64[s]').astype('int64') + 60) // self.timeframe.value
+			return src_complete and next_minute_key != self.key
+
+		return src_complete and resample_cpl(None, np.array([date_l]), True, self.timeframe, self.calendar, self.session)[0]
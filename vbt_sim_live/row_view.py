@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import numpy as np
+import pytz
+
+class RowView():
+
+	"""Zero-copy view of a single row of LiveData features, the latest one by default.
+
+	Values are read from the current feature arrays on access, so a view can be created once (see LiveData.row_view())
+	and re-used for every update, also in ring buffer mode. Features are available by attribute (view.close) or by
+	key (view['close']). Dates are returned as datetime64, datetime() converts them on request only.
+	"""
+
+	__slots__ = ('_live_data', '_features', '_index')
+
+	def __init__(self, live_data, features: list = None, index: int = -1):
+		object.__setattr__(self, '_live_data', live_data)
+		object.__setattr__(self, '_features', None if features is None else frozenset(features))
+		object.__setattr__(self, '_index', index)
+
+		for f in features or []:
+			if not live_data.has_feature(f):
+				raise Exception("No feature with name", f)
+
+	def __getitem__(self, name: str):
+		if self._features is not None and name not in self._features:
+			raise KeyError(name)
+		return self._live_data.data[name][self._index]
+
+	def __getattr__(self, name: str):
+		try:
+			return self[name]
+		except KeyError:
+			raise AttributeError(name)
+
+	def __setattr__(self, name, value):
+		raise AttributeError("RowView is read only")
+
+	def keys(self) -> list:
+		return [n for n in self._live_data.get_feature_names() if self._features is None or n in self._features]
+
+	def to_dict(self) -> dict:
+
+		"""Return a copy of the row as dict."""
+
+		return {n: self[n] for n in self.keys()}
+
+	def datetime(self, name: str = 'date', tz_convert: bool = True) -> datetime.datetime:
+
+		"""Return a date feature as datetime, converted to the timezone of the data if tz_convert is set."""
+
+		ts = self[name].astype('datetime64[us]').astype(datetime.datetime).replace(tzinfo=datetime.timezone.utc)
+		return ts.astimezone(pytz.timezone(self._live_data.tz)) if tz_convert else ts
+
+def rows_to_records(data: dict, names: list, idx_range: range | slice) -> np.ndarray:
+
+	"""Return a numpy structured array with the given features for an index range, dates are kept as datetime64."""
+
+	if isinstance(idx_range, range):
+		stop = None if idx_range.stop == 0 and idx_range.start < 0 else idx_range.stop
+		idx_range = slice(idx_range.start, stop, idx_range.step)
+
+	columns = [data[n][idx_range] for n in names]
+	records = np.empty(len(columns[0]) if columns else 0, dtype=[(n, c.dtype) for n, c in zip(names, columns)])
+
+	for n, c in zip(names, columns):
+		records[n] = c
+
+	return records
+
+def records_to_datetime(values: np.ndarray, tz: str = None) -> list:
+
+	"""Convert datetime64 values (e.g. a date field of records) to a list of datetimes, in timezone tz if given."""
+
+	dts = values.astype('datetime64[us]').astype(datetime.datetime)
+	tzinfo = pytz.timezone(tz) if tz is not None else None
+	return [d.replace(tzinfo=datetime.timezone.utc).astimezone(tzinfo) if tzinfo else d for d in dts]
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from .trading_calendar import TradingCalendar, get_default_calendar
+
+class SessionFilter():
+
+	"""Defines which candles are kept, by the time of day of their date in the timezone of the calendar.
+	Candles on days that are not session days of the calendar are never kept.
+
+	session: 'rth' for the regular session of the calendar (considering half days),
+		'eth' for extended hours, from eth_open (pre-market) to eth_close (after-hours), which end early on half days as well,
+		or a custom window (start, end) given as times of day in seconds or 'HH:MM' strings
+	eth_open, eth_close: times of day in seconds, e.g. 14400 for 04:00
+
+	See LiveData.from_df(..., session=...) and SimData.from_df(..., session=...).
+	"""
+
+	def __init__(self, session = 'rth', calendar: TradingCalendar = None, eth_open: int = 14400, eth_close: int = 72000):
+		self.calendar = calendar or get_default_calendar()
+		self.eth_open = eth_open
+		self.eth_close = eth_close
+
+		if isinstance(session, str):
+			if session not in ['rth', 'eth']:
+				raise Exception("Invalid session, needs to be 'rth', 'eth' or a window (start, end), not", session)
+			self.session = session
+			self.start = None
+			self.end = None
+		else:
+			self.session = 'custom'
+			self.start, self.end = [self.to_seconds(t) for t in session]
+
+			if self.start >= self.end:
+				raise Exception("Invalid session window, start needs to be before end", session)
+
+		# day bounds and window of the latest day looked up by contains(), as nanoseconds since Unix Epoch
+		self.bounds = (0, 0, 0, 0)
+
+	@classmethod
+	def from_arg(cls, session, calendar: TradingCalendar = None):
+
+		"""Return a SessionFilter for session given as SessionFilter, name or window (see SessionFilter), or None for None."""
+
+		if session is None or isinstance(session, SessionFilter):
+			return session
+
+		return cls(session, calendar)
+
+	@staticmethod
+	def to_seconds(t: int | str) -> int:
+
+		"""Return a time of day given as seconds or 'HH:MM' string in seconds."""
+
+		if isinstance(t, str):
+			h, m = t.split(':')
+			return int(h) * 3600 + int(m) * 60
+
+		return int(t)
+
+	def window(self, days: np.ndarray | int) -> tuple:
+
+		"""Return start and end of the session window on days as times of day in seconds."""
+
+		if self.session == 'rth':
+			return self.calendar.session_open, self.calendar.session_close_time(days)
+		elif self.session == 'eth':
+			return self.eth_open, self.calendar.session_close_time(days) + (self.eth_close - self.calendar.session_close)
+
+		return self.start, self.end
+
+	def mask(self, date: np.ndarray) -> np.ndarray:
+
+		"""Return whether (UTC) datetime64 dates are within the session."""
+
+		days, tzi = self.calendar.local_time(np.asarray(date))
+		start, end = self.window(days)
+		return self.calendar.is_session_day(days) & (tzi >= start) & (tzi < end)
+
+	def contains(self, date: np.datetime64) -> bool:
+
+		"""Return whether a single (UTC) datetime64 date is within the session. The window is looked up once per day,
+		so this is O(1) for a stream of updates.
+		"""
+
+		ns = np.datetime64(date, 'ns').astype(np.int64)
+		day_start, day_end, start, end = self.bounds
+
+		if not day_start <= ns < day_end:
+			day = self.calendar.day_index(np.datetime64(date, 'ns'))
+			day_start, day_end = self.calendar.to_utc([day, day + 1], [0, 0]).astype(np.int64)
+			start, end = 0, 0
+
+			if self.calendar.is_session_day(day):
+				start, end = self.calendar.to_utc([day, day], self.window(day)).astype(np.int64)
+
+			self.bounds = (day_start, day_end, start, end)
+
+		return start <= ns < end
+
+	def end_of_session(self, days: np.ndarray | int) -> np.ndarray:
+
+		"""Return the end of the session window on days as (UTC) datetime64."""
+
+		days = np.atleast_1d(days)
+		return self.calendar.to_utc(days, np.broadcast_to(self.window(days)[1], days.shape))
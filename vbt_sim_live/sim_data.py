@@ -4,15 +4,37 @@ import indicators as inst
 import pandas as pd
 import numpy as np
 import vectorbtpro as vbt
-from .vectorbtpro_helpers import get_target_index
+import weakref
 from vbt_sim_live import GenericData, TFs
+from .generic_data import ohlc_feature_info
+from .resampler import resample_ohlcv
+from .session_filter import SessionFilter
+from .trading_calendar import get_default_calendar
+
+# resampled vbt.Data by timeframe name, per source vbt.Data (by identity), see SimData.resample()
+resample_cache = {}
+
+def get_resample_cache(data) -> dict:
+
+	"""Return the cache of resampled data for the source data. It is dropped with the source data, and since
+	vbt.Data objects are replaced rather than modified when features are added, a cache never outlives its data.
+	"""
+
+	entry = resample_cache.get(id(data))
+	
+	if entry is None or entry[0]() is not data:
+		entry = (weakref.ref(data), {})
+		resample_cache[id(data)] = entry
+		weakref.finalize(data, resample_cache.pop, id(data), None)
+		
+	return entry[1]
  
 class SimData(GenericData):
 
 	"""Data class that can holds sim data in form of a vbt.Data class""" 
     
-	def __init__(self, data, symbol, timeframe, tz, log_handler = None):
-		super().__init__(data, symbol, timeframe, tz, log_handler)
+	def __init__(self, data, symbol, timeframe, tz, log_handler = None, calendar = None, session = None):
+		super().__init__(data, symbol, timeframe, tz, log_handler, calendar=calendar, session=session)
   
 	@classmethod		
 	def from_barlist(cls, bars, timeframe, tz = 'America/New_York'):
@@ -31,21 +53,31 @@ class SimData(GenericData):
 	)
 
 	@classmethod		
-	def from_df(cls, df: pd.DataFrame, symbol: str, timeframe: TFs, tz = 'America/New_York', log_handler = None):
+	def from_df(cls, df: pd.DataFrame, symbol: str, timeframe: TFs, tz = 'America/New_York', log_handler = None, calendar = None, 
+			session: SessionFilter | str | tuple = None):
 
 		"""This method creates a LiveData object based on
 		df: DataFrame with input data, needs to have correct feature names and date as index
 		symbol: ticker to define stock
 		timeframe: timeframe for the given input data (no auto detect)
+		session: keep only intraday candles within the session, 'rth', 'eth' or a window such as ('09:30', '12:00') (see SessionFilter)
 		
 		Returns a new LiveData object.
 		""" 
+		
+		session = SessionFilter.from_arg(session, calendar or get_default_calendar(tz))
+		
+		if session is not None and timeframe.is_intraday():
+			df = df[session.mask(df.index.values)]
+			
 		return cls(
 			data = vbt.Data.from_data(df, single_key=True, tz_convert=None),
 			symbol = symbol,
 			timeframe = timeframe,
 			tz = tz,
-			log_handler = log_handler
+			log_handler = log_handler,
+			calendar = calendar,
+			session = session
 	)
 	
 	def get_dtype(self, feature_name: str) -> pd.Series.dtype:
@@ -88,13 +120,17 @@ class SimData(GenericData):
 	
 	def resample(self, timeframe: TFs):
 
-		"""This function will resample (downsample) the current data to a new timeframe.
+		"""This function will resample (downsample) the current OHLCV data to a new timeframe.
 		timeframe: Specifies the new timeframe.
 		
-		date_l and cpl have special dtypes other than float (int64, bool) and therefore need special treatment.
-		Perhaps there is a better way but for now I need to remove and re-add those features.
+		The OHLCV arrays are reduced directly with the resample kernel (see resampler.resample_ohlcv()), so date_l (datetime) 
+		and cpl (bool) keep their dtypes and the source data is neither copied nor modified. cpl is taken from the last 
+		source row of each candle. Candles are the same as those of LiveData.resample() and are created for periods with 
+		source data only: d1 candles (from intraday data) are built from the session in the timezone of the calendar
+		and dated at local midnight, w1 and M1 candles (from d1 data) are dated at midnight UTC.
 		
-		vbth.get_target_index is required to close possible gaps in the target index, see below.
+		Resampled data is cached per source data and timeframe, so repeated calls return a new SimData object 
+		on the same resampled data. Features other than OHLCV are not resampled.
 		
 		Returns a new SimData object.
 		"""	
@@ -102,48 +138,44 @@ class SimData(GenericData):
 		if timeframe.is_intraday() and self.timeframe != TFs['m1']:
 			raise Exception("m1 timeframe required as source timeframe when resampling to intraday timeframes")
 
-		elif timeframe.is_outsideday() and self.timeframe != TFs['d1']:
+		elif timeframe == TFs['d1'] and not self.timeframe.is_intraday():
+			raise Exception("intraday timeframe required as source timeframe when resampling to daily timeframe")
+
+		elif timeframe.is_outsideday() and timeframe != TFs['d1'] and self.timeframe != TFs['d1']:
 			raise Exception("d1 timeframe required as source timeframe when resampling to weekly or monthly timeframes")
 
 		elif timeframe == self.timeframe:
 			raise Exception("source and target timeframes cannot be same", timeframe, self.timeframe)
 
-		self.log("resampling")
-		# temporarily set date_l to int for proper resampling
-		date_l = self.data.get('date_l').astype('int64')
-			
-		# remove_features is required to update dtype properly from object to int - otherwise will remain what was before = object
-		self.data = self.data.remove_features('date_l').add_feature('date_l', date_l)
-		
-		# define resampler for special fields
-		self.data.feature_config["date_l"] = dict(resample_func=lambda self, obj, resampler: obj.vbt.resample_apply(resampler, vbt.nb.last_reduce_nb))
-		self.data.feature_config["cpl"] = dict(resample_func=lambda self, obj, resampler: obj.vbt.resample_apply(resampler, vbt.nb.last_reduce_nb))
-
-		
-		# we need to correct the target timeframe for intraday in case of missing data.
-		# e.g. a missing 19:50 candle on the 1m still needs to create a 19:50 5m candle.
+		cache = get_resample_cache(self.data)
 		
-		if timeframe.is_intraday():
-			data_resampled = self.data.resample(get_target_index(self.data.index, timeframe), timeframe.flip())
-		else:
-			data_resampled = self.data.resample(timeframe.flip())
-
-		# need to convert and re-add feature to obtain bool type
-		cpl = data_resampled.get('cpl').astype(bool)
-		data_resampled = data_resampled.remove_features('cpl').add_feature('cpl', cpl)
+		if timeframe.name not in cache:
+			self.log("resampling")
+			cache[timeframe.name] = self.resample_data(timeframe)
 				
-		date_l = data_resampled.get('date_l').astype('datetime64[ns]')
-		data_resampled = data_resampled.remove_features('date_l').add_feature('date_l',date_l)
-
-		volume = data_resampled.get('volume').astype('int64')
-		data_resampled = data_resampled.remove_features('volume').add_feature('volume',volume)
+		return SimData(cache[timeframe.name], self.symbol, timeframe, self.tz, self.log_handler, self.calendar, self.session)
 
-		# now set date_l back to datetime after resampling is complete with int type
-		date_l = self.data.get('date_l').astype('datetime64[ns]')
-		self.data = self.data.remove_features('date_l').add_feature('date_l', date_l)
-				
-		return SimData(data_resampled, self.symbol, timeframe, self.tz, self.log_handler)
+	def resample_data(self, timeframe: TFs):
 
+		"""This function returns the OHLCV data resampled to timeframe as vbt.Data, see resample()."""
+		
+		data = {f['name']: np.asarray(self.get_feature(f['name'])) for f in ohlc_feature_info}
+		
+		# the kernel works on nanoseconds, the index may have another resolution (e.g. microseconds with pandas 3)
+		data['date'] = data['date'].astype('datetime64[ns]')
+		data['date_l'] = data['date_l'].astype('datetime64[ns]')
+		
+		# same candles as LiveData.resample(), e.g. d1 from the session in the timezone of the calendar
+		keys, ret = resample_ohlcv(data, timeframe, self.calendar, self.session)
+		
+		if keys is None:
+			raise Exception("No valid timeframe for resampling", timeframe)
+			
+		target_index = pd.DatetimeIndex(ret.pop('date'), tz='UTC').tz_convert(self.data.index.tz)
+		ret['volume'] = ret['volume'].astype('int64')
+		
+		df = pd.DataFrame({f['name']: ret[f['name']] for f in ohlc_feature_info if f['name'] != 'date'}, index=target_index)
+		return vbt.Data.from_data(df, single_key=True, tz_convert=None)
 
 	def realign(self, data_source, realign_info: dict) -> None:
 
@@ -220,7 +252,7 @@ class SimData(GenericData):
 
 			# collect input arguments from IF definitions			
 			input_args = [self.get_feature(n) for n in vbt_indicator.input_names]
-			input_args += [i[1].get(n, None) for n in vbt_indicator.param_names]
+			input_args += [i[1].get(n, getattr(inst, i[0] + "_").param_defaults.get(n)) for n in vbt_indicator.param_names]
 	
 			input_args_is_none = [n is None for n in input_args]
 				
@@ -231,6 +263,7 @@ class SimData(GenericData):
 			kwargs = {
 				 'timeframe':self.timeframe, 
 				  'tz': self.tz,				 
+				 'calendar': self.calendar,
 				 'class_name':i[0],
 				 'param_product':True
 				}
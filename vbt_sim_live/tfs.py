@@ -2,28 +2,80 @@
 
 from enum import Enum
 
-class TFs(Enum):
-	
-	"""Timeframe class that holds names and corresponding timeframe length in seconds."""	
+class TimeframeMethods():
+
+	"""Methods shared by TFs members and custom Timeframe objects."""
+
+	def flip(self) -> str:
+		"""Return name with digits and unit shifted, e.g. "m1" -> "1m" """
+		return self.name[1:len(self.name)] + self.name[0]
+
+	def is_intraday(self) -> bool:
+		"""True if timeframe is below one day """
+		return self.value < 24*60*60
+
+	def is_outsideday(self) -> bool:
+		"""True if timeframe is day or higher """
+		return self.value >= 24*60*60
+
+class TFs(TimeframeMethods, Enum):
+
+	"""Timeframe class that holds names and corresponding timeframe length in seconds.
+	Timeframes that are not listed here can be created with TFs.from_name(), e.g. TFs.from_name('m65').
+	"""
 
 	m1 = 60
 	m2 = 2*60
-	m3 = 2*60
+	m3 = 3*60
 	m5 = 5*60
+	m10 = 10*60
 	m15 = 15*60
 	m30 = 30*60
+	h1 = 60*60
+	h4 = 4*60*60
 	d1 = 24*60*60
 	w1 = d1*7
 	M1 = d1*31
-	
-	def flip(self) -> str:
-		"""Return name with digits and unit shifted, e.g. "m1" -> "1m" """			
-		return self.name[1:len(self.name)] + self.name[0]
-		
-	def is_intraday(self) -> bool:
-		"""True if timeframe is below one day """			
-		return self.value < 24*60*60
 
-	def is_outsideday(self) -> bool:
-		"""True if timeframe is day or higher """			
-		return self.value >= 24*60*60
\ No newline at end of file
+	@classmethod
+	def from_name(cls, name: str):
+
+		"""Return the TFs member for name, or a Timeframe for any other intraday name of unit
+		s (seconds), m (minutes) or h (hours) followed by the number of units, e.g. 'm65' or 'h2'.
+		"""
+
+		if name in cls.__members__:
+			return cls[name]
+
+		unit, number = name[:1], name[1:]
+
+		if unit not in Timeframe.units or not number.isdigit() or int(number) == 0:
+			raise Exception("Invalid timeframe name", name)
+
+		value = Timeframe.units[unit] * int(number)
+
+		if value >= 24*60*60:
+			raise Exception("Only intraday timeframes can be created by name, not", name)
+
+		return Timeframe(name, value)
+
+class Timeframe(TimeframeMethods):
+
+	"""Timeframe that is not a member of TFs, see TFs.from_name(). It provides name and value (in seconds) like TFs members
+	and compares equal to timeframes with the same name.
+	"""
+
+	units = {'s': 1, 'm': 60, 'h': 60*60}
+
+	def __init__(self, name: str, value: int):
+		self.name = name
+		self.value = value
+
+	def __eq__(self, other) -> bool:
+		return isinstance(other, TimeframeMethods) and self.name == other.name
+
+	def __hash__(self) -> int:
+		return hash(self.name)
+
+	def __repr__(self) -> str:
+		return "<Timeframe." + self.name + ": " + str(self.value) + ">"
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from .tfs import TFs
+
+class TickAggregator():
+
+	"""Aggregates trades into candles (m1 by default) that can be fed to LiveData.update_many() or LiveData.update().
+
+	Trades are added in batches of price, size and timestamp arrays and processed with vectorized numpy operations,
+	so there are no Python objects created per trade. The in-progress candle is kept between batches.
+	date_l is set to the timestamp of the latest trade of a candle, cpl is set once a trade of a later candle comes in
+	(or by flush()).
+
+	cadence: minimum time in seconds between two emitted updates of the in-progress candle, measured in trade time.
+	With cadence 0, the in-progress candle is emitted with every batch. Completed candles are always emitted.
+	"""
+
+	def __init__(self, timeframe: TFs = TFs['m1'], cadence: float = 0):
+		self.timeframe = timeframe
+		self.cadence = int(cadence * 10**9)
+		self.tf_ns = timeframe.value * 10**9
+
+		# in-progress candle, key is the number of candles since Unix Epoch (-1 if there is none)
+		self.key = -1
+		self.open = np.nan
+		self.high = np.nan
+		self.low = np.nan
+		self.close = np.nan
+		self.volume = 0.0
+		self.date_l = 0
+
+		# trades for this or earlier candles are dropped
+		self.completed_key = -1
+
+		# trade time of the latest emitted update of the in-progress candle
+		self.emitted = 0
+
+	def add(self, price: np.ndarray, size: np.ndarray, timestamp: np.ndarray) -> dict | None:
+
+		"""Add a batch of trades. timestamp needs to be datetime64 (UTC) or int64 nanoseconds since Unix Epoch.
+		Trades that belong to an already completed candle are dropped.
+
+		Returns candle updates as dict of arrays with OHLCV feature names, or None if there is nothing to emit.
+		"""
+
+		price = np.asarray(price, dtype=np.float64)
+		size = np.asarray(size, dtype=np.float64)
+		ts = np.asarray(timestamp)
+		ts = ts.astype('datetime64[ns]').view(np.int64) if ts.dtype.kind == 'M' else ts.astype(np.int64)
+
+		if not ts.size:
+			return None
+
+		if ts.size > 1 and (ts[1:] < ts[:-1]).any():
+			order = np.argsort(ts, kind='stable')
+			price, size, ts = price[order], size[order], ts[order]
+
+		keys = ts // self.tf_ns
+
+		if keys[0] <= self.completed_key:
+			valid = keys > self.completed_key
+			price, size, ts, keys = price[valid], size[valid], ts[valid], keys[valid]
+
+		if not ts.size:
+			return None
+
+		# candles within this batch
+		starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+		ends = np.append(starts[1:], ts.size) - 1
+
+		out_key = keys[starts]
+		out_open = price[starts]
+		out_high = np.maximum.reduceat(price, starts)
+		out_low = np.minimum.reduceat(price, starts)
+		out_close = price[ends]
+		out_volume = np.add.reduceat(size, starts)
+		out_date_l = ts[ends]
+
+		# merge first candle of the batch into the in-progress candle, or complete the in-progress candle
+		completed = None
+		new_candle = out_key[-1] != self.key
+
+		if out_key[0] == self.key:
+			out_open[0] = self.open
+			out_high[0] = max(out_high[0], self.high)
+			out_low[0] = min(out_low[0], self.low)
+			out_volume[0] += self.volume
+		elif self.key >= 0:
+			completed = self.candle(True)
+
+		# last candle of the batch is in progress now, all candles before are complete
+		self.key = out_key[-1]
+		self.completed_key = self.key - 1
+		self.open, self.high, self.low, self.close = out_open[-1], out_high[-1], out_low[-1], out_close[-1]
+		self.volume = out_volume[-1]
+		self.date_l = out_date_l[-1]
+
+		# completed candles are always emitted, the in-progress candle when it is new or according to cadence
+		n_out = out_key.size
+		if new_candle or self.date_l - self.emitted >= self.cadence:
+			self.emitted = self.date_l
+		else:
+			n_out -= 1
+
+		if n_out == 0 and completed is None:
+			return None
+
+		cpl = np.ones(out_key.size, dtype=np.bool_)
+		cpl[-1] = False
+
+		ret = {
+			'date': (out_key[:n_out] * self.tf_ns).astype('datetime64[ns]'),
+			'date_l': out_date_l[:n_out].astype('datetime64[ns]'),
+			'open': out_open[:n_out],
+			'high': out_high[:n_out],
+			'low': out_low[:n_out],
+			'close': out_close[:n_out],
+			'volume': out_volume[:n_out],
+			'cpl': cpl[:n_out],
+		}
+
+		if completed is not None:
+			ret = {k: np.concatenate((completed[k], v)) for k, v in ret.items()}
+
+		return ret
+
+	def flush(self, now: np.datetime64 = None) -> dict | None:
+
+		"""Complete the in-progress candle, e.g. at the end of a session, and return it as candle update.
+		If now is given, the candle is only completed if its period has ended by then.
+		"""
+
+		if self.key < 0:
+			return None
+
+		if now is not None and np.datetime64(now, 'ns').astype(np.int64) < (self.key + 1) * self.tf_ns:
+			return None
+
+		ret = self.candle(True)
+		self.completed_key = self.key
+		self.key = -1
+		return ret
+
+	def candle(self, cpl: bool = False) -> dict:
+
+		"""Return the in-progress candle as candle update."""
+
+		return {
+			'date': np.array([self.key * self.tf_ns], dtype='datetime64[ns]'),
+			'date_l': np.array([self.date_l], dtype='datetime64[ns]'),
+			'open': np.array([self.open]),
+			'high': np.array([self.high]),
+			'low': np.array([self.low]),
+			'close': np.array([self.close]),
+			'volume': np.array([self.volume]),
+			'cpl': np.array([cpl], dtype=np.bool_),
+		}
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from .tz_offsets import get_tz_offsets
+
+class TradingCalendar():
+
+	"""Trading calendar that is built once and answers day lookups in O(1).
+
+	All days are day indices since Unix Epoch in the timezone of the calendar, the same as date_tz_d of IndicatorBasic.
+	Session days, holidays, half days, week ends (last session day of a week) and month ends (last session day of a month)
+	are kept as sorted integer arrays, and as flags per day of the calendar range for lookups.
+
+	start, end: range of the calendar, dates or strings
+	holidays: days without session (weekends are excluded anyway), half_days: days with an early close
+	session_open, session_close, half_day_close: times of day in seconds, e.g. 34200 for 09:30
+
+	Without holidays, week ends are Fridays and month ends are the last business days, as before.
+	"""
+
+	def __init__(self, start = '1970-01-01', end = '2100-12-31', holidays: list = [], half_days: list = [], tz: str = 'America/New_York',
+			session_open: int = 34200, session_close: int = 57600, half_day_close: int = 46800):
+
+		self.tz = tz
+		self.tz_offsets = get_tz_offsets(tz)
+		self.session_open = session_open
+		self.session_close = session_close
+		self.half_day_close = half_day_close
+
+		self.first_day = int(self.to_day(start))
+		days = np.arange(self.first_day, self.to_day(end) + 1)
+
+		self.holidays = np.unique(self.to_day(holidays)).astype(np.int64)
+		self.half_days = np.unique(self.to_day(half_days)).astype(np.int64)
+
+		# 1.1.1970 was a Thursday, weekday 0 is Monday
+		weekday = (days + 3) % 7
+		self.session_days = days[(weekday < 5) & ~np.isin(days, self.holidays)]
+
+		# last session day of each week (starting on Mondays) and of each month
+		week = (self.session_days + 3) // 7
+		month = self.session_days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+		self.week_ends = self.session_days[np.append(week[1:] != week[:-1], True)]
+		self.month_ends = self.session_days[np.append(month[1:] != month[:-1], True)]
+
+		# flags per day for lookups
+		self.is_session = np.isin(days, self.session_days)
+		self.is_half = np.isin(days, self.half_days)
+		self.is_week_end = np.isin(days, self.week_ends)
+		self.is_month_end = np.isin(days, self.month_ends)
+
+	@staticmethod
+	def to_day(dates) -> np.ndarray | int:
+
+		"""Return the day index since Unix Epoch of dates given as day, string or datetime (list), without any timezone conversion."""
+
+		return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+	def local_time(self, date: np.ndarray | np.datetime64) -> tuple:
+
+		"""Return day index and time of day in seconds of (UTC) datetime64 dates in the timezone of the calendar, see TzOffsets."""
+
+		if not np.ndim(date):
+			return self.tz_offsets.local_time_single(date)
+
+		return self.tz_offsets.local_time(date)
+
+	def day_index(self, date: np.ndarray | np.datetime64) -> np.ndarray | int:
+
+		"""Return the day index of (UTC) datetime64 dates in the timezone of the calendar."""
+
+		return self.local_time(date)[0]
+
+	def midnight(self, days: np.ndarray) -> np.ndarray:
+
+		"""Return midnight of day indices in the timezone of the calendar as (UTC) datetime64."""
+
+		local = pd.DatetimeIndex(np.asarray(days).astype('datetime64[D]')).tz_localize(self.tz)
+		return local.tz_convert('UTC').tz_localize(None).values.astype('datetime64[ns]')
+
+	def to_utc(self, days: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+
+		"""Return times of day in seconds on day indices in the timezone of the calendar as (UTC) datetime64."""
+
+		local = np.asarray(days).astype('datetime64[D]') + np.asarray(seconds).astype('timedelta64[s]')
+		local = pd.DatetimeIndex(np.atleast_1d(local)).tz_localize(self.tz, ambiguous='NaT', nonexistent='shift_forward')
+		return local.tz_convert('UTC').tz_localize(None).values.astype('datetime64[ns]')
+
+	def in_session(self, date: np.ndarray | np.datetime64) -> np.ndarray | bool:
+
+		"""Return whether (UTC) datetime64 dates are within the regular session of a session day."""
+
+		days, tzi = self.local_time(date)
+		return self.is_session_day(days) & (tzi >= self.session_open) & (tzi < self.session_close_time(days))
+
+	def lookup(self, flags: np.ndarray, days: np.ndarray | int) -> np.ndarray | bool:
+
+		"""Return flags for day indices, raise Exception for days outside of the calendar range."""
+
+		i = np.asarray(days) - self.first_day
+
+		if np.any(i < 0) or np.any(i >= len(flags)):
+			raise Exception("Day outside of trading calendar range", days)
+
+		return flags[i]
+
+	def is_session_day(self, days: np.ndarray | int) -> np.ndarray | bool:
+		return self.lookup(self.is_session, days)
+
+	def is_half_day(self, days: np.ndarray | int) -> np.ndarray | bool:
+		return self.lookup(self.is_half, days)
+
+	def is_last_day_of_week(self, days: np.ndarray | int) -> np.ndarray | bool:
+		return self.lookup(self.is_week_end, days)
+
+	def is_last_day_of_month(self, days: np.ndarray | int) -> np.ndarray | bool:
+		return self.lookup(self.is_month_end, days)
+
+	def session_close_time(self, days: np.ndarray | int) -> np.ndarray | int:
+
+		"""Return the time of day in seconds the session closes at, considering half days."""
+
+		return np.where(self.is_half_day(days), self.half_day_close, self.session_close)
+
+	def session_end(self, days: np.ndarray | int) -> np.ndarray:
+
+		"""Return the session close of day indices as (UTC) datetime64, considering half days."""
+
+		days = np.atleast_1d(days)
+		return self.to_utc(days, self.session_close_time(days))
+
+	def is_extended(self, tzi: np.ndarray | int, days: np.ndarray | int) -> np.ndarray | bool:
+
+		"""Return whether times of day in seconds (tzi) on days are outside of the regular session."""
+
+		return (tzi < self.session_open) | (tzi >= self.session_close_time(days))
+
+default_calendars = {}
+
+def get_default_calendar(tz: str = 'America/New_York') -> TradingCalendar:
+
+	"""Return the calendar used if none is given for timezone tz, created on first use."""
+
+	if tz not in default_calendars:
+		default_calendars[tz] = TradingCalendar(tz=tz)
+
+	return default_calendars[tz]
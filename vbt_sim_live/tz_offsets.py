@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from zoneinfo import ZoneInfo
+
+NS_PER_DAY = 24*60*60 * 10**9
+
+class TzOffsets():
+
+	"""UTC offsets of a timezone as table of offset transitions, built once from the tz database of zoneinfo.
+
+	(UTC) datetime64 dates are converted into local time with integer arithmetic, by looking up the offset that is
+	in effect with a binary search over the transitions (batch form, see local_time()), or in O(1) for a stream of dates,
+	where the interval between the transitions of the latest lookup is kept (single-value form, see local_time_single()).
+
+	Transitions are found through the public interface of zoneinfo (see find_transitions()) between 1850 and 2100, 
+	so offsets are the same as timezone conversion with pandas/zoneinfo within these years. Earlier and later dates get
+	the offset in effect at the start and end of the range. Fixed offset timezones, e.g. UTC, have a single offset.
+	"""
+
+	probe_start = np.datetime64('1850-01-01', 'ns')
+	probe_end = np.datetime64('2100-01-01', 'ns')
+	probe_step = 6*60*60 * 10**9
+
+	def __init__(self, tz: str):
+		self.tz = tz
+		self.tzinfo = ZoneInfo(tz)
+		seconds, self.offsets = self.find_transitions()
+
+		# transitions in nanoseconds since Unix Epoch, the first one covers all earlier dates
+		self.transitions = np.concatenate(([np.iinfo(np.int64).min], seconds[1:] * 10**9)).astype(np.int64)
+		self.bounds = np.append(self.transitions[1:], np.iinfo(np.int64).max)
+
+		# interval and offset of the latest lookup of local_time_single()
+		self.latest = (0, -1, 0)
+
+	def utc_offsets(self, seconds: np.ndarray) -> np.ndarray:
+
+		"""Return the UTC offsets in seconds of dates given in seconds since Unix Epoch, converted by pandas with zoneinfo."""
+
+		utc = pd.DatetimeIndex(np.asarray(seconds, dtype=np.int64).astype('datetime64[s]').astype('datetime64[ns]'))
+		local = utc.tz_localize('UTC').tz_convert(self.tzinfo).tz_localize(None)
+		return (local.values.astype('datetime64[s]').astype(np.int64) - utc.values.astype('datetime64[s]').astype(np.int64))
+
+	def find_transitions(self) -> tuple:
+
+		"""Return the transitions in seconds since Unix Epoch (the first entry is the start of the range) and the offsets
+		in seconds from each of them on. The offset is probed every probe_step, each change of it is narrowed down 
+		to the second by bisection. A timezone without changes has a single offset.
+		"""
+
+		probes = np.arange(self.probe_start.astype(np.int64), self.probe_end.astype(np.int64), self.probe_step) // 10**9
+		offsets = self.utc_offsets(probes)
+		changes = np.flatnonzero(offsets[1:] != offsets[:-1])
+
+		# the first second with the new offset lies in (lo, hi]
+		lo, hi = probes[changes], probes[changes + 1]
+		while len(lo) and (hi - lo > 1).any():
+			mid = (lo + hi) // 2
+			new = self.utc_offsets(mid) == offsets[changes + 1]
+			lo, hi = np.where(new, lo, mid), np.where(new, mid, hi)
+
+		return np.concatenate((probes[:1], hi)), np.concatenate((offsets[:1], offsets[changes + 1])).astype(np.int64)
+
+	@staticmethod
+	def as_int64(date) -> np.ndarray | int:
+
+		"""Return (UTC) dates as nanoseconds since Unix Epoch. Dates can be datetime64 or a (tz-aware) DatetimeIndex."""
+
+		if isinstance(date, pd.DatetimeIndex):
+			date = date.tz_convert('UTC').tz_localize(None) if date.tz is not None else date
+			return date.values.astype('datetime64[ns]').astype(np.int64)
+
+		return np.asarray(date).astype('datetime64[ns]').astype(np.int64)
+
+	def offset_index(self, ns: np.ndarray) -> np.ndarray:
+
+		"""Return the index of the transition in effect for dates given in nanoseconds."""
+
+		return np.searchsorted(self.transitions, ns, side='right') - 1
+
+	def to_local_ns(self, date) -> np.ndarray | int:
+
+		"""Return dates as local time in nanoseconds since Unix Epoch, i.e. the local wall-clock time as if it was UTC."""
+
+		ns = self.as_int64(date)
+		return ns + self.offsets[self.offset_index(ns)] * 10**9
+
+	def local_time(self, date) -> tuple:
+
+		"""Return day index since Unix Epoch and time of day in seconds of (UTC) dates in the timezone."""
+
+		local = self.to_local_ns(date)
+		days = local // NS_PER_DAY
+		tzi = (local - days * NS_PER_DAY) // 10**9
+		return days, tzi
+
+	def local_time_single(self, date: np.datetime64) -> tuple:
+
+		"""Return day index and time of day in seconds of a single (UTC) date as ints, see local_time().
+		The offset is looked up once per interval between transitions, so this is O(1) for a stream of updates.
+		"""
+
+		ns = int(np.datetime64(date, 'ns').astype(np.int64))
+		start, end, offset = self.latest
+
+		if not start <= ns < end:
+			i = int(self.offset_index(ns))
+			start, end, offset = int(self.transitions[i]), int(self.bounds[i]), int(self.offsets[i]) * 10**9
+			self.latest = (start, end, offset)
+
+		days, rest = divmod(ns + offset, NS_PER_DAY)
+		return days, rest // 10**9
+
+	def to_datetime(self, date: np.ndarray) -> list:
+
+		"""Return (UTC) datetime64 dates as list of tz-aware datetime with second resolution, same as datetime.astimezone().
+		Local times that occur twice, when the offset decreases, have fold=1 the second time.
+		"""
+
+		ns = self.as_int64(np.atleast_1d(date))
+		ns = ns - ns % 10**9
+		i = self.offset_index(ns)
+		local = ns + self.offsets[i] * 10**9
+		
+		previous = self.offsets[np.maximum(i - 1, 0)]
+		fold = (previous > self.offsets[i]) & (local < self.transitions[i] + previous * 10**9)
+		
+		local = local.astype('datetime64[ns]').astype('datetime64[s]').tolist()
+		return [d.replace(tzinfo=self.tzinfo, fold=int(f)) for d, f in zip(local, fold)]
+
+tz_offsets = {}
+
+def get_tz_offsets(tz: str) -> TzOffsets:
+
+	"""Return the TzOffsets of timezone tz, created on first use."""
+
+	if tz not in tz_offsets:
+		tz_offsets[tz] = TzOffsets(tz)
+
+	return tz_offsets[tz]
+
+def time_of_day_hm(tzi: np.ndarray | int) -> np.ndarray | int:
+
+	"""Return times of day in seconds as int value, e.g. 930 for 09:30."""
+
+	return tzi // 3600 * 100 + tzi % 3600 // 60